@@ -0,0 +1,93 @@
+"""
+Benchmark for the BoxOfficeMojo results table parser (extraction/boxoffice_api/table_parser.py).
+
+Parses the weekly pages saved by WeeklyPageCache (historical_data/cache/boxofficemojo) with each parser backend
+and with the previous approach (whole page parsed with html.parser, hidden cells found with str(cell)),
+checks that they extract the same table, and reports throughput in pages per second.
+When no pages have been saved yet, a synthetic weekly page is used instead.
+
+Usage: python benchmarks/bench_boxoffice_parser.py [--pages-dir DIR] [--repeat N]
+"""
+import sys
+import gzip
+import time
+import argparse
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR / "plugins"))
+from bs4 import BeautifulSoup
+from extraction.boxoffice_api.page_cache import DEFAULT_PAGE_CACHE_DIR
+from extraction.boxoffice_api.table_parser import parse_results_table, PARSER_BACKENDS, lxml
+
+
+def legacy_parse(html: str):
+    table = BeautifulSoup(html, "html.parser").find("table", "mojo-body-table")
+    if table is None:
+        return None
+    rows = table.find_all("tr")
+    headers = [th.get_text().replace("\n", "") for th in rows[0].find_all("th") if "hidden" not in str(th)]
+    body = [[td.get_text().replace("\n", "") for td in row.find_all("td") if "hidden" not in str(td)] for row in rows[1:]]
+    return headers, body
+
+
+def synthetic_page(n_rows: int = 150) -> str:
+    columns = ["Rank", "LW", "Release", "Gross", "%± LW", "Theaters", "Change", "Average", "Total Gross", "Weeks", "Distributor"]
+    header = "".join(f'<th class="a-text-left mojo-field-type-{i}"><a href="?sort={i}">{name}</a></th>' for i, name in enumerate(columns))
+    header += '<th class="a-text-right mojo-hidden-from-mobile hidden">Estimated</th>'
+    rows = []
+    for r in range(n_rows):
+        cells = "".join(f'<td class="a-text-right mojo-field-type-{i}"><a class="a-link-normal" href="/release/rl{r}{i}/">value {r} {i}\n</a></td>'
+                        for i in range(len(columns)))
+        cells += '<td class="a-text-right hidden">-</td>'
+        rows.append(f"<tr>{cells}</tr>")
+    navigation = "".join(f'<li class="mojo-nav-item"><a href="/nav/{i}/">Link {i}</a></li>' for i in range(400))
+    return (f"<html><head><title>Weekly</title></head><body><ul>{navigation}</ul>"
+            f'<div id="table"><table class="a-bordered mojo-body-table"><tr>{header}</tr>{"".join(rows)}</table></div>'
+            f"<footer>{navigation}</footer></body></html>")
+
+
+def load_pages(pages_dir: Path) -> list:
+    pages = []
+    for path in sorted(pages_dir.glob("*.html.gz")):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+
+def time_parser(parse, pages: list, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages:
+            parse(html)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages-dir", default=DEFAULT_PAGE_CACHE_DIR, help="directory of saved weekly pages")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs")
+    args = parser.parse_args()
+
+    pages = load_pages(Path(args.pages_dir)) if Path(args.pages_dir).exists() else []
+    if not pages:
+        print("no saved weekly pages found, using a synthetic page")
+        pages = [synthetic_page()] * 20
+
+    parsers = {"legacy (html.parser + str(cell))": legacy_parse}
+    for backend in PARSER_BACKENDS:
+        if backend == "lxml" and lxml is None:
+            print("lxml is not installed, skipping the lxml backend")
+            continue
+        parsers[backend] = lambda html, backend=backend: parse_results_table(html, backend=backend)
+
+    expected = [legacy_parse(html) for html in pages]
+    for name, parse in parsers.items():
+        assert [parse(html) for html in pages] == expected, f"{name} extracted a different table"
+
+    print(f"pages: {len(pages)}, rows: {sum(len(table[1]) for table in expected if table)}")
+    for name, parse in parsers.items():
+        best = time_parser(parse, pages, args.repeat)
+        print(f"{name}: best of {args.repeat}: {best * 1000:.1f} ms ({len(pages) / best:,.1f} pages/s)")
@@ -0,0 +1,67 @@
+"""
+Benchmark for the movie details transform (extraction/tmdb_movie/transform.py).
+
+Runs `transform_movie_records` over the raw TMDB movie NDJSON files (plain or gzip compressed) in
+historical_data/raw_historical_data/tmdb_movie and reports throughput in records per second.
+
+The sample file only holds one week of releases, most of them without revenue, so by default the records are
+repeated (with distinct ids) to the size of a full raw_movie_details drop, and a share of the copies is given
+a revenue so the cleaned table is not almost empty.
+
+Usage: python benchmarks/bench_clean_movie_details.py [--repeat N] [--scale K] [--revenue-share S]
+"""
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR / "plugins"))
+from extraction.tmdb_movie.transform import transform_movie_records
+from googlecloud.compression import open_raw_file
+
+RAW_DIR = ROOT_DIR / "historical_data" / "raw_historical_data" / "tmdb_movie"
+
+
+def load_records(directory: Path) -> list:
+    records = []
+    for path in sorted([*directory.glob("*.ndjson"), *directory.glob("*.ndjson.gz")]):
+        with open_raw_file(str(path), mode="r") as ndjson_file:
+            records.extend(json.loads(line) for line in ndjson_file if line.strip())
+    return records
+
+
+def scale_records(records: list, scale: int, revenue_share: float) -> list:
+    """Repeats the records `scale` times with distinct ids, giving a revenue to `revenue_share` of the copies lacking one."""
+    scaled = []
+    id_offset = max(record["id"] for record in records) + 1
+    every = round(1 / revenue_share) if revenue_share > 0 else 0
+    for copy in range(scale):
+        for record in records:
+            record = dict(record, id=record["id"] + copy * id_offset)
+            if every and not record.get("revenue") and len(scaled) % every == 0:
+                record["revenue"] = 1_000_000
+            scaled.append(record)
+    return scaled
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs")
+    parser.add_argument("--scale", type=int, default=400, help="repeat the records K times to simulate a full raw file")
+    parser.add_argument("--revenue-share", type=float, default=0.5, help="share of the copies without revenue given one")
+    args = parser.parse_args()
+
+    records = scale_records(load_records(RAW_DIR), args.scale, args.revenue_share)
+    transform_movie_records(records) # warm up
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        df = transform_movie_records(records)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    print(f"records: {len(records)}, cleaned rows: {len(df)}")
+    print(f"best of {args.repeat}: {best * 1000:.2f} ms ({len(records) / best:,.0f} records/s)")
@@ -0,0 +1,44 @@
+"""
+Benchmark for the people details transform (extraction/tmdb_people/transform.py).
+
+Runs `transform_people_records` over historical_data/raw_historical_data/tmdb_people/raw_people_20240422.ndjson
+and reports throughput in records per second.
+
+Usage: python benchmarks/bench_clean_people_details.py [--repeat N] [--scale K]
+"""
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR / "plugins"))
+from extraction.tmdb_people.transform import transform_people_records
+
+RAW_FILE = ROOT_DIR / "historical_data" / "raw_historical_data" / "tmdb_people" / "raw_people_20240422.ndjson"
+
+
+def load_records(path: Path) -> list:
+    with open(path) as ndjson_file:
+        return [json.loads(line) for line in ndjson_file if line.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20, help="number of timed runs")
+    parser.add_argument("--scale", type=int, default=1, help="repeat the records K times to simulate a larger file")
+    args = parser.parse_args()
+
+    records = load_records(RAW_FILE) * args.scale
+    transform_people_records(records) # warm up
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        df = transform_people_records(records)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    print(f"records: {len(records)}, cleaned rows: {len(df)}")
+    print(f"best of {args.repeat}: {best * 1000:.2f} ms ({len(records) / best:,.0f} records/s)")
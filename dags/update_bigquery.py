@@ -4,14 +4,15 @@ from airflow.operators.python import PythonOperator
 from airflow.models import Variable
 from googlecloud.upload_initial_data_bigquery import upload_df_to_table #type:ignore 
 from googlecloud.upload_new_data_bigquery import upsert_df_to_table, update_df_to_table #type:ignore
-from extraction.tmdb_movie.movie import get_movie_tmdb_details, clean_new_raw_movie_details #type:ignore
+from extraction.tmdb_movie.movie import get_movie_tmdb_details, clean_new_raw_movie_details, commit_movie_watermark #type:ignore
 from extraction.tmdb_people.people import get_tmdb_people_details, clean_new_raw_people_details, clean_updated_people_details #type:ignore
 from extraction.video_stats.clean_per_erd import clean_raw_video_statistics #type:ignore
 from extraction.video_stats.collection import extract_raw_video_stats #type:ignore
-from extraction.tmdb_collection.collection import collection_ids_to_update, get_collection_tmdb_details, clean_update_collections_details #type:ignore
+from extraction.tmdb_collection.collection import collection_ids_to_update, changed_collection_ids_to_refresh, get_collection_tmdb_details, clean_update_collections_details #type:ignore
 from extraction.boxoffice_api.boxoffice_func import get_update_batch_dataset, get_update_batch_dataset_by_week #type:ignore
 from extraction.boxoffice_api.boxoffice_clean_per_erd import clean_update_weekly_domestic_performance #type:ignore
 from datetime import datetime
+import pandas as pd
 from dateutil.relativedelta import relativedelta
 
 # at the start of each month, new data is to be ingested into gcs, then transformed and loaded into bigquery
@@ -24,12 +25,26 @@ def etl_tmdb_movie_task(**context):
     project_id = "is3107-418809"
     dataset_id = "movie_dataset"
     table_id = "movie"
-    start_date = (start_date - relativedelta(months=3)).strftime('%Y-%m-%d')
-    end_date = (end_date - relativedelta(months=3)).strftime('%Y-%m-%d')
-    get_movie_tmdb_details(start_date, end_date)
+    release_start_date = (start_date - relativedelta(months=3)).strftime('%Y-%m-%d')
+    release_end_date = (end_date - relativedelta(months=3)).strftime('%Y-%m-%d')
+    # only re-fetch existing movies that TMDB reports as changed during this run's week
+    get_movie_tmdb_details(release_start_date, release_end_date, changes_start_date=start_date.date(), changes_end_date=end_date.date(), slim=True)
     df = clean_new_raw_movie_details('', return_df = True)
     upsert_df_to_table(project_id, dataset_id, table_id, ['movie_id'], df, staging_dataset_id="staging_dataset")
 
+    # collection ids of the upserted movies, pulled by etl_tmdb_collection to refresh their aggregates
+    return df['collection_id'].dropna().astype(int).unique().tolist()
+
+def commit_tmdb_movie_watermark_task(**context):
+    """
+    Moves the movie changes watermark to the end of this run's changes window.
+
+    Runs last, so the watermark only moves once the movies (and the collections pulled from them) have been loaded
+    into BigQuery. If any task fails, the next run re-reads the changes from the previous watermark.
+    """
+    end_date = datetime.strptime(context.get('ds'), "%Y-%m-%d")
+    commit_movie_watermark(end_date.date())
+
 def etl_tmdb_person_task(**context):
      # initialize start and end dates
     end_date = datetime.strptime(context.get('ds'), "%Y-%m-%d")
@@ -77,25 +92,29 @@ def etl_video_stats_task(**context):
     if len(df) > 0:
         upsert_df_to_table(project_id, dataset_id, table_id, primary_key_columns=["movie_id", "video_key_id"], df=df)
 
-def etl_tmdb_collection_task():
+def etl_tmdb_collection_task(**context):
     """
-    Extracts, transforms, and loads by appending new collection data into a BigQuery table.
+    Extracts, transforms, and loads new and changed collection data into a BigQuery table.
     
     This function performs the following steps:
     1. Calls the `collection_ids_to_update` function which compares the collection ids in movie bigquery table and collection bigquery table, returning a series of collection ids not in collection bigquery database
-    2. If there are collection_ids to be appended to existing callection table
+    2. Calls the `changed_collection_ids_to_refresh` function with the collection ids of the movies upserted by etl_tmdb_movie in this run, returning the existing collections whose aggregates are stale
+    3. If there are collection_ids to be added or refreshed
         a. Calls the `get_collection_tmdb_details` function to extract raw data from tmdb collection api
         b. Calls the `clean_update_collections_details` function to clean and transform the data and return a DataFrame.
-        c. Calls the `upload_df_to_table function` to upload the cleaned DataFrame to the specified BigQuery table, using the "append" mode.
+        c. Calls the `upsert_df_to_table function` to merge the cleaned DataFrame into the specified BigQuery table.
     """
     project_id = "is3107-418809"
     dataset_id = "movie_dataset"
     table_id = "collection"
-    collection_ids = collection_ids_to_update()
+    movie_collection_ids = context['ti'].xcom_pull(task_ids='etl_tmdb_movie') or []
+    new_collection_ids = collection_ids_to_update()
+    changed_collection_ids = changed_collection_ids_to_refresh(movie_collection_ids)
+    collection_ids = pd.concat([new_collection_ids, changed_collection_ids], axis=0).drop_duplicates()
     if len(collection_ids) > 0:
         collection_results = get_collection_tmdb_details(collection_ids)
         update_df = clean_update_collections_details(collection_results, save_file_path='', return_df=True)
-        upload_df_to_table(project_id, dataset_id, table_id, update_df, mode="append")  
+        upsert_df_to_table(project_id, dataset_id, table_id, ['collection_id'], update_df, staging_dataset_id="staging_dataset")
 
 def etl_weekly_domestic_performance_task(**context): 
     """
@@ -136,5 +155,6 @@ with DAG(dag_id = 'update_bigquery', default_args=default_args, schedule_interva
     etl_video_stats = PythonOperator(task_id='etl_video_stats', python_callable=etl_video_stats_task)
     etl_tmdb_collection = PythonOperator(task_id='etl_tmdb_collection', python_callable=etl_tmdb_collection_task)
     etl_weekly_domestic_performance = PythonOperator(task_id='etl_weekly_domestic_performance', python_callable=etl_weekly_domestic_performance_task)
+    commit_tmdb_movie_watermark = PythonOperator(task_id='commit_tmdb_movie_watermark', python_callable=commit_tmdb_movie_watermark_task)
  
-    etl_tmdb_movie >> [etl_tmdb_person, etl_video_stats, etl_tmdb_collection, etl_weekly_domestic_performance]
\ No newline at end of file
+    etl_tmdb_movie >> [etl_tmdb_person, etl_video_stats, etl_tmdb_collection, etl_weekly_domestic_performance] >> commit_tmdb_movie_watermark
\ No newline at end of file
@@ -2,11 +2,19 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path.cwd()))
 from extraction.boxoffice_api.validator import Validator
-from bs4 import BeautifulSoup
+from extraction.boxoffice_api.page_cache import WeeklyPageCache
+from extraction.boxoffice_api.politeness import HostLimiter
+from extraction.boxoffice_api.table_parser import parse_results_table, DEFAULT_PARSER
+from extraction.boxoffice_api.omdb_cache import OMDbResponseCache, DEFAULT_OMDB_MAX_AGE, is_cacheable
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 import concurrent.futures
 import calendar
+from datetime import timedelta
+
+DEFAULT_OMDB_WORKERS = 4
 
 
 class BoxOffice:
@@ -14,32 +22,75 @@ class BoxOffice:
     A package For getting Box office Information
     """
 
-    def __init__(self, api_key=None, outputformat: str = "dict"):
+    def __init__(self, api_key=None, outputformat: str = "dict", cache: WeeklyPageCache = None, pool_size: int = 10,
+                 limiter: HostLimiter = None, max_retries: int = 3, backoff_factor: float = 1, parser: str = DEFAULT_PARSER,
+                 omdb_cache: OMDbResponseCache = None, omdb_max_age: timedelta = DEFAULT_OMDB_MAX_AGE,
+                 omdb_workers: int = DEFAULT_OMDB_WORKERS):
         """
         initial class
         :param api_key: an api key from https://www.omdbapi.com/ if you provide an api key, you will also get
         movie poster url and movie description director and artists
         a free type of api provides 1000 calls per day so use it carefully
+        :param cache: optional persistent cache of weekly pages, weeks it treats as final are not downloaded again
+        :param pool_size: number of pooled connections kept open to boxofficemojo.com
+        :param limiter: politeness limits shared by all requests to boxofficemojo.com, defaults to HostLimiter()
+        :param max_retries: retries of failed or throttled (429/5xx) page requests, with exponential backoff
+        :param backoff_factor: base delay in seconds of the exponential backoff between retries
+        :param parser: HTML parser backend of the results table, "lxml" (default when installed) or "bs4"
+        :param omdb_cache: persistent cache of OMDb responses shared across weeks and runs, the default cache is
+        opened when an api key is given
+        :param omdb_max_age: age after which a cached OMDb response is looked up again
+        :param omdb_workers: number of concurrent OMDb lookups of the uncached titles of a page
         """
         self._api_key = api_key
         self._output = []
         self._output_format = outputformat
         self._validate = Validator()
+        self._cache = cache
+        self._parser = parser
+        self._limiter = limiter if limiter is not None else HostLimiter()
+        self._omdb_cache = omdb_cache if omdb_cache is not None or api_key is None else OMDbResponseCache()
+        self._omdb_max_age = omdb_max_age
+        self._omdb_workers = omdb_workers
+        self._session = requests.Session()
+        retry = Retry(total=max_retries, backoff_factor=backoff_factor, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=["GET"], respect_retry_after_header=True, raise_on_status=False)
+        self._session.mount("https://", HTTPAdapter(pool_maxsize=pool_size, max_retries=retry))
+
+    @staticmethod
+    def _table_rows(html, parser: str = DEFAULT_PARSER):
+        table = parse_results_table(html, backend=parser)
+        if table is None:
+            print("We couldn't find any result for this")
+        return table
 
     @staticmethod
-    def check_results(url):
+    def check_results(url, session=None, parser: str = DEFAULT_PARSER):
+        try:
+            response = (session or requests).get(url).text
+            return BoxOffice._table_rows(response, parser=parser)
+        except Exception as e:
+            print(f"Error occurred: {e} Check Your Connection or wait  afew Second")
+
+    def _weekly_rows(self, year: int, week: int):
+        """
+        Returns the parsed results table of a weekly page, downloading the page once over the pooled session
+        unless the cache holds a final copy of it.
+        """
+        html = self._cache.get(year, week) if self._cache is not None else None
+        if html is not None:
+            return self._table_rows(html, parser=self._parser)
+        weekly_url = f"https://www.boxofficemojo.com/weekly/{year}W{week}/?ref_=bo_wly_table_1"
         try:
-            response = requests.get(url).text
-            daily_soap = BeautifulSoup(response, "html.parser")
-            table = daily_soap.find("table", "mojo-body-table")
-            if table:
-                table_rows = table.find_all("tr")
-                return table_rows
-            else:
-                print("We couldn't find any result for this")
-                return None
+            with self._limiter:
+                html = self._session.get(weekly_url).text
         except Exception as e:
             print(f"Error occurred: {e} Check Your Connection or wait  afew Second")
+            return None
+        table = self._table_rows(html, parser=self._parser)
+        if table is not None and self._cache is not None and self._cache.is_immutable(year, week):
+            self._cache.put(year, week, html)
+        return table
 
     def get_weekly(self, year: int, week: int):
         """
@@ -50,45 +101,54 @@ class BoxOffice:
         """
         validator = Validator()
         if validator.check_weekly(year=year, week=week):
-            weekly_url = f"https://www.boxofficemojo.com/weekly/{year}W{week}/?ref_=bo_wly_table_1"
-            if self.check_results(url=weekly_url):
-                soap = self.check_results(url=weekly_url)
-                result = self._collect_data(soap=soap)
+            table = self._weekly_rows(year=year, week=week)
+            if table is not None:
+                result = self._collect_data(table=table)
                 if self._output_format == "DF":
                     df = pd.DataFrame(result)
                     return df
                 return result
 
 
-    def _collect_data(self, soap):
-        self._output = []
-        headers = []
-        requests_cache = {}  # Cache API requests to avoid duplicates
-
-        for index, row in enumerate(soap):
-            if index == 0:
-                th_element = row.find_all("th")
-                headers = [th.get_text().replace("\n", "") for th in th_element if "hidden" not in str(th)]
-            else:
-                td_element = row.find_all("td")
-                local_list = [td.get_text().replace("\n", "") for td in td_element if "hidden" not in str(td)]
-                if len(local_list) < 3:
-                    continue  # Skip rows with insufficient data
-                title = local_list[2]
-                local_dict = {header: local_list[i] for i, header in enumerate(headers)}
-
-                if title not in requests_cache:
-                    if self._api_key is not None:
-                        api_url = f"https://www.omdbapi.com/?t={title}&apikey={self._api_key}"
-                        with concurrent.futures.ThreadPoolExecutor() as executor:
-                            api_response = executor.submit(requests.get, api_url).result().json()
-                        requests_cache[title] = api_response
-                    else:
-                        requests_cache[title] = {}
-
-                for key, val in requests_cache[title].items():
-                    local_dict[key] = val
-
-                self._output.append(local_dict)
-
-        return self._output
\ No newline at end of file
+    def _omdb_lookup(self, title: str) -> dict:
+        try:
+            response = self._session.get("https://www.omdbapi.com/", params={"t": title, "apikey": self._api_key})
+            return response.json()
+        except Exception as e:
+            print(f"Error occurred looking up {title!r} on OMDb: {e}")
+            return {}
+
+    def _omdb_responses(self, titles: list) -> dict:
+        """
+        Returns the OMDb responses of titles, taking them from the OMDb cache when fresh and
+        looking up all the others concurrently.
+        """
+        if self._api_key is None:
+            return {title: {} for title in titles}
+        responses = self._omdb_cache.get_fresh(titles, max_age=self._omdb_max_age) if self._omdb_cache is not None else {}
+        uncached = [title for title in titles if title not in responses]
+        if uncached:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self._omdb_workers) as executor:
+                fetched = dict(zip(uncached, executor.map(self._omdb_lookup, uncached)))
+            if self._omdb_cache is not None:
+                self._omdb_cache.put_many({title: response for title, response in fetched.items() if is_cacheable(response)})
+            responses.update(fetched)
+        return responses
+
+    def _collect_data(self, table):
+        output = [] # local so that weeks can be collected from several threads
+        headers, rows = table
+        rows = [local_list for local_list in rows if len(local_list) >= 3] # Skip rows with insufficient data
+        requests_cache = self._omdb_responses(list(dict.fromkeys(local_list[2] for local_list in rows)))
+
+        for local_list in rows:
+            title = local_list[2]
+            local_dict = {header: local_list[i] for i, header in enumerate(headers)}
+
+            for key, val in requests_cache[title].items():
+                local_dict[key] = val
+
+            output.append(local_dict)
+
+        self._output = output
+        return output
\ No newline at end of file
@@ -6,6 +6,8 @@ import os
 from datetime import date, datetime
 from googlecloud.read_data_gcs import read_blob, list_blobs, list_blobs_object
 from googlecloud.read_data_bigquery import load_data_from_table
+from googlecloud.columnar import columnar_blobs
+from extraction.boxoffice_api.title_matcher import match_nearest_release
 from google.cloud import storage
 from io import BytesIO
 
@@ -15,12 +17,12 @@ from io import BytesIO
 def get_tmdb_date_id_title_gcs():
     """Get Raw TMDB Data from GCS and transform (release_date, id, title)"""
     bucket_name = "movies_tmdb"
-    filenames = list_blobs("movies_tmdb", prefix="raw_movie_details")
+    filenames = columnar_blobs(list_blobs("movies_tmdb", prefix="raw_movie_details"))
     interested_col = ['release_date', 'id', 'title']
     df =  pd.DataFrame()
     #read file from gcs and get interested col
     for filename in filenames:
-        file_content = read_blob(bucket_name, filename)[interested_col]
+        file_content = read_blob(bucket_name, filename, columns=interested_col)
         df = pd.concat([df, file_content], axis=0)
     df["title_cleaned"] = df["title"].str.strip().str.replace(r'\W+', ' ', regex=True).str.lower()
 
@@ -103,18 +105,14 @@ def get_clean_weekly_domestic_performance(data_path:str, return_df=False):
     df = get_tmdb_date_id_title_bigquery()
     intermmediate_df = get_boxofficemojo_data_gcs()
 
-    final_df = intermmediate_df.merge(df, on='title_cleaned', how='left')
-    final_df = final_df.dropna(subset=['id']) #drop those that we can't find a match (state as not available)
-    final_df['likely_release_date'] = pd.to_datetime(final_df['likely_release_date'])
-    final_df['release_date'] = pd.to_datetime(final_df['release_date'])
-    final_df['days_diff'] = (final_df['likely_release_date'] - final_df['release_date']).dt.days.abs()
+    #by title and week, find most likely id: nearest release date within 50 days (those without a match are dropped, state as not available)
+    final_df = match_nearest_release(intermmediate_df, df, max_days_diff=50)
     final_df.columns = final_df.columns.str.lower()
-    final_df = final_df.loc[final_df.groupby(['title_cleaned', 'week_end_date'])['days_diff'].idxmin()].sort_values(['week_end_date', 'rank']) #by title and week, find most likely id
+    final_df = final_df.sort_values(['week_end_date', 'rank', 'title_cleaned'])
     final_df['id'] = final_df['id'].astype(int, errors='ignore')
 
     interested_final = ['week_end_date', 'id', 'rank', 'gross', 'theaters']
-    #choose 50 as cut off (increasing days diff increases uncertainty of correct matches)
-    interested_final_df = (final_df.loc[final_df['days_diff']<=50,interested_final]
+    interested_final_df = (final_df[interested_final]
                            .rename(columns={'id': 'movie_id', 'gross':'domestic_gross', 'theaters': 'domestic_theaters_count'}))
 
     if not return_df:
@@ -163,18 +161,14 @@ def clean_update_weekly_domestic_performance(data_path:str, return_df=False):
     df = get_tmdb_date_id_title_bigquery()
     intermmediate_df = cleaning_raw_data(get_boxofficedata_all())
 
-    final_df = intermmediate_df.merge(df, on='title_cleaned', how='left')
-    final_df = final_df.dropna(subset=['id']) #drop those that we can't find a match (state as not available)
-    final_df['likely_release_date'] = pd.to_datetime(final_df['likely_release_date'])
-    final_df['release_date'] = pd.to_datetime(final_df['release_date'])
-    final_df['days_diff'] = (final_df['likely_release_date'] - final_df['release_date']).dt.days.abs()
+    #by title and week, find most likely id: nearest release date within 50 days (those without a match are dropped, state as not available)
+    final_df = match_nearest_release(intermmediate_df, df, max_days_diff=50)
     final_df.columns = final_df.columns.str.lower()
-    final_df = final_df.loc[final_df.groupby(['title_cleaned', 'week_end_date'])['days_diff'].idxmin()].sort_values(['week_end_date', 'rank']) #by title and week, find most likely id
+    final_df = final_df.sort_values(['week_end_date', 'rank', 'title_cleaned'])
     final_df['id'] = final_df['id'].astype(int, errors='ignore')
 
     interested_final = ['week_end_date', 'id', 'rank', 'gross', 'theaters']
-    #choose 50 as cut off (increasing days diff increases uncertainty of correct matches)
-    interested_final_df = (final_df.loc[final_df['days_diff']<=50,interested_final]
+    interested_final_df = (final_df[interested_final]
                            .rename(columns={'id': 'movie_id', 'gross':'domestic_gross', 'theaters': 'domestic_theaters_count'}))
 
     if not return_df:
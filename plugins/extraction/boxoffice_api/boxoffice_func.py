@@ -2,7 +2,9 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path.cwd()))
 from extraction.boxoffice_api.boxoffice_app import BoxOffice 
+from extraction.boxoffice_api.page_cache import WeeklyPageCache
 from googlecloud.upload_initial_data_gcs import delete_many_blobs, upload_many_blobs_with_transfer_manager, upload_blob
+from googlecloud.compression import compressed_name
 import os
 import logging
 from importlib import reload
@@ -10,6 +12,9 @@ import numpy as np
 import pandas as pd
 from datetime import datetime
 import shutil
+import concurrent.futures
+
+DEFAULT_SCRAPE_WORKERS = 4 # matches the default max in-flight requests of HostLimiter
 
 
 def weeks_str() -> np.array:
@@ -22,14 +27,30 @@ def data_by_year_week(box_office_obj, year:int, week:str) -> pd.DataFrame:
     sub_df.insert(0, "year", year)
     return sub_df
 
+def scrape_weeks(box_office_obj, year_weeks: list, max_workers: int = DEFAULT_SCRAPE_WORKERS) -> pd.DataFrame:
+    """
+    Scrapes several weeks concurrently. Requests to boxofficemojo.com stay within the politeness limits
+    and retries of the BoxOffice object.
+
+    Args:
+        box_office_obj (BoxOffice): BoxOffice object shared by all workers.
+        year_weeks (list): List of (year, week) pairs to scrape.
+        max_workers (int): Number of weeks scraped concurrently. Default is 4.
+
+    Returns:
+        pd.DataFrame: Weekly data of all weeks, in the order of `year_weeks`.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        frames = list(executor.map(lambda year_week: data_by_year_week(box_office_obj, *year_week), year_weeks))
+    return pd.concat(frames, axis=0) if frames else pd.DataFrame()
+
 def get_batch_dataset(datapath:str, start_year:int=2021, end_year:int=2024) -> None:
     #configuration
     reload(logging)
     logging.basicConfig(level=logging.INFO)
 
     # note that 1 year has 52 weeks
-    box_office_obj = BoxOffice(outputformat="DF")
-    df = pd.DataFrame()
+    box_office_obj = BoxOffice(outputformat="DF", cache=WeeklyPageCache()) # past weeks are read from the page cache
     now_year = datetime.now().year
     now_week = datetime.now().isocalendar()[1] #get until now week - 2: ensure there's data)
     weeks_array = weeks_str()
@@ -37,14 +58,14 @@ def get_batch_dataset(datapath:str, start_year:int=2021, end_year:int=2024) -> N
     if start_year <= now_year and end_year <= now_year:
         logging.info(f"Start Data Extraction")
 
+        year_weeks = []
         for year in np.array(range(start_year, end_year+1)):
             logging.info(f"{year=}")
             if year < now_year:
-                for week in weeks_array:
-                    df = pd.concat([df, data_by_year_week(box_office_obj, year, week)], axis=0)
+                year_weeks.extend((year, week) for week in weeks_array)
             else:
-                for week in weeks_array[0:now_week-2]:
-                    df = pd.concat([df, data_by_year_week(box_office_obj, year, week)], axis=0)
+                year_weeks.extend((year, week) for week in weeks_array[0:now_week-2])
+        df = scrape_weeks(box_office_obj, year_weeks)
                     
         logging.info(f"End Data Extraction")
         
@@ -52,7 +73,7 @@ def get_batch_dataset(datapath:str, start_year:int=2021, end_year:int=2024) -> N
         if not os.path.exists(data_path):
             os.makedirs(data_path)
 
-        df.to_csv(os.path.join(data_path, f"boxofficemojo_data_{start_year}{end_year}.csv"), index=False)
+        df.to_csv(os.path.join(data_path, compressed_name(f"boxofficemojo_data_{start_year}{end_year}.csv")), index=False)
 
     else:
         raise ValueError("Start Year or End Year provided not Valid")
@@ -68,8 +89,7 @@ def get_update_batch_dataset(year=int) -> pd.DataFrame:
     # note that 1 year has 52 weeks
     start_year = year
     end_year = year
-    box_office_obj = BoxOffice(outputformat="DF")
-    df = pd.DataFrame()
+    box_office_obj = BoxOffice(outputformat="DF", cache=WeeklyPageCache()) # past weeks are read from the page cache
     now_year = datetime.now().year
     now_week = datetime.now().isocalendar()[1] #get until now week - 2: ensure there's data)
     weeks_array = weeks_str()
@@ -77,15 +97,15 @@ def get_update_batch_dataset(year=int) -> pd.DataFrame:
     if start_year <= now_year and end_year <= now_year:
         logging.info(f"Start Data Extraction")
 
+        year_weeks = []
         for year in np.array(range(start_year, end_year+1)):
             logging.info(f"{year=}")
             if year < now_year:
-                for week in weeks_array[48:53]:
-                    df = pd.concat([df, data_by_year_week(box_office_obj, year, week)], axis=0)
+                year_weeks.extend((year, week) for week in weeks_array[48:53])
             else:
                 #at least 4 weeks worth of data every run (to ensure no missing data in dag)
-                for week in weeks_array[max(0, now_week-6):(now_week-2)]:
-                    df = pd.concat([df, data_by_year_week(box_office_obj, year, week)], axis=0)
+                year_weeks.extend((year, week) for week in weeks_array[max(0, now_week-6):(now_week-2)])
+        df = scrape_weeks(box_office_obj, year_weeks)
                     
         logging.info(f"End Data Extraction")
     
@@ -103,11 +123,11 @@ def get_update_batch_dataset(year=int) -> pd.DataFrame:
         if not os.path.exists(folder_path):
             os.makedirs(folder_path)
         date_now = datetime.now().date()
-        df.to_csv(os.path.join(folder_path, f"update_boxofficemojo_{date_now}.csv"), index=False)
+        filename = compressed_name(f"update_boxofficemojo_{date_now}.csv")
+        df.to_csv(os.path.join(folder_path, filename), index=False)
 
         try:   
             bucket_name = "update_movies_tmdb"
-            filename = f"update_boxofficemojo_{date_now}.csv"
             upload_blob(bucket_name, source_file_name = os.path.join(folder_path,filename), destination_blob_name=filename)
             #remove local directory after upload
             if os.path.exists(folder_path):
@@ -128,8 +148,7 @@ def get_update_batch_dataset_by_week(week=int, year=int) -> pd.DataFrame:
     # note that 1 year has 52 weeks
     start_year = year
     end_year = year
-    box_office_obj = BoxOffice(outputformat="DF")
-    df = pd.DataFrame()
+    box_office_obj = BoxOffice(outputformat="DF", cache=WeeklyPageCache()) # past weeks are read from the page cache
     now_year = datetime.now().year
     now_week = datetime.now().isocalendar()[1] #get until now week - 2: ensure there's data)
 
@@ -141,9 +160,11 @@ def get_update_batch_dataset_by_week(week=int, year=int) -> pd.DataFrame:
     if start_year <= now_year and end_year <= now_year:
         logging.info(f"Start Data Extraction")
 
+        year_weeks = []
         for i in range(week_start_index, week_end_index+1):
             logging.info(f"{year_array[i]=}; {weeks_array[i]=}")
-            df = pd.concat([df, data_by_year_week(box_office_obj, year_array[i], weeks_array[i])], axis=0)
+            year_weeks.append((year_array[i], weeks_array[i]))
+        df = scrape_weeks(box_office_obj, year_weeks)
                     
         logging.info(f"End Data Extraction")
     
@@ -161,11 +182,11 @@ def get_update_batch_dataset_by_week(week=int, year=int) -> pd.DataFrame:
         if not os.path.exists(folder_path):
             os.makedirs(folder_path)
         date_now = datetime.now().date()
-        df.to_csv(os.path.join(folder_path, f"update_boxofficemojo_{week}_{year}.csv"), index=False)
+        filename = compressed_name(f"update_boxofficemojo_{week}_{year}.csv")
+        df.to_csv(os.path.join(folder_path, filename), index=False)
 
         try:   
             bucket_name = "update_movies_tmdb"
-            filename = f"update_boxofficemojo_{week}_{year}.csv"
             upload_blob(bucket_name, source_file_name = os.path.join(folder_path,filename), destination_blob_name=filename)
             #remove local directory after upload
             if os.path.exists(folder_path):
@@ -0,0 +1,88 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from datetime import timedelta
+
+DEFAULT_OMDB_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))),
+                                       "historical_data", "cache", "omdb_responses.sqlite")
+DEFAULT_OMDB_MAX_AGE = timedelta(days=30) # ratings and grosses in OMDb responses drift slowly, titles chart for weeks
+
+
+def is_cacheable(response: dict) -> bool:
+    """
+    Returns True if an OMDb response is worth storing: a found title, or a title OMDb does not know.
+    Errors such as an exhausted daily quota or an invalid key are not stored, so the title is looked up again.
+    """
+    return response.get("Response") == "True" or response.get("Error") == "Movie not found!"
+
+
+class OMDbResponseCache:
+    """
+    Persistent on-disk cache of OMDb responses, keyed by the title looked up.
+
+    Shared across weeks and runs, so a title charting for several weeks is only looked up once per `max_age`.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_OMDB_CACHE_PATH):
+        """
+        Opens (and creates if needed) the cache database.
+
+        Args:
+            db_path (str): Path of the SQLite file backing the cache.
+        """
+        folder_path = os.path.dirname(db_path)
+        if folder_path and not os.path.exists(folder_path):
+            os.makedirs(folder_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=60, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS omdb_responses (
+                title TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        ''')
+        self._conn.commit()
+
+    def get_fresh(self, titles, max_age: timedelta = DEFAULT_OMDB_MAX_AGE) -> dict:
+        """
+        Returns the stored responses fetched within `max_age`.
+
+        Args:
+            titles (iterable): Titles to look up.
+            max_age (timedelta): Freshness window. Default is 30 days.
+
+        Returns:
+            dict: The fresh responses, keyed by title.
+        """
+        titles = list(titles)
+        fetched_after = time.time() - max_age.total_seconds()
+        responses = {}
+        with self._lock:
+            for start in range(0, len(titles), 500): # stay under SQLite's bound variable limit
+                batch = titles[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT title, response FROM omdb_responses WHERE fetched_at >= ? AND title IN ({','.join('?' * len(batch))})",
+                    (fetched_after, *batch)).fetchall()
+                responses.update({title: json.loads(response) for title, response in rows})
+        return responses
+
+    def put_many(self, responses: dict):
+        """
+        Stores OMDb responses, stamped with the current time.
+
+        Args:
+            responses (dict): OMDb responses, keyed by title.
+        """
+        fetched_at = time.time()
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO omdb_responses (title, response, fetched_at) VALUES (?, ?, ?)",
+                                   [(title, json.dumps(response), fetched_at) for title, response in responses.items()])
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,78 @@
+import os
+import gzip
+from datetime import date, datetime, timedelta
+
+DEFAULT_PAGE_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))),
+                                      "historical_data", "cache", "boxofficemojo")
+DEFAULT_IMMUTABLE_AFTER = timedelta(weeks=3) # weekly grosses are no longer revised this long after the week ends
+
+
+class WeeklyPageCache:
+    """
+    Persistent on-disk cache of BoxOfficeMojo weekly pages, keyed by (year, week).
+
+    Pages of weeks that ended more than `immutable_after` ago are treated as final and are never downloaded
+    again. Pages of recent weeks are neither stored nor served, since their numbers may still be revised.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_PAGE_CACHE_DIR, immutable_after: timedelta = DEFAULT_IMMUTABLE_AFTER):
+        """
+        Args:
+            cache_dir (str): Directory holding the cached pages.
+            immutable_after (timedelta): Age after the end of a week from which its page is treated as final.
+                Default is 3 weeks.
+        """
+        self.cache_dir = cache_dir
+        self.immutable_after = immutable_after
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+    def _path(self, year: int, week: int) -> str:
+        return os.path.join(self.cache_dir, f"{int(year)}W{int(week):02d}.html.gz")
+
+    def _immutable_from(self, year: int, week: int) -> date:
+        """Returns the first day on which the week is treated as final."""
+        return date.fromisocalendar(int(year), int(week), 7) + self.immutable_after + timedelta(days=1)
+
+    def is_immutable(self, year: int, week: int) -> bool:
+        """Returns True if the week ended more than `immutable_after` ago."""
+        return date.today() >= self._immutable_from(year, week)
+
+    def get(self, year: int, week: int):
+        """
+        Returns the cached page of a week, if it is cached and immutable and the page was stored
+        once the week was already final.
+
+        Args:
+            year (int): Year of the week.
+            week (int): Week number.
+
+        Returns:
+            str or None: The page HTML, or None if it has to be downloaded.
+        """
+        path = self._path(year, week)
+        if not self.is_immutable(year, week) or not os.path.exists(path):
+            return None
+        if datetime.fromtimestamp(os.path.getmtime(path)).date() < self._immutable_from(year, week):
+            return None # stored while the week could still be revised, download the final numbers
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return f.read()
+
+    def put(self, year: int, week: int, html: str):
+        """
+        Stores the page of a week, if the week is immutable. Pages of recent weeks are not stored,
+        so a copy downloaded while the week was still being revised is never served as final.
+
+        Args:
+            year (int): Year of the week.
+            week (int): Week number.
+            html (str): The page HTML.
+        """
+        if not self.is_immutable(year, week):
+            return
+        path = self._path(year, week)
+        # Write to a temporary file first so concurrent or interrupted runs never leave a truncated page
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(tmp_path, path)
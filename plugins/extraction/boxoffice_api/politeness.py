@@ -0,0 +1,39 @@
+import time
+import threading
+
+DEFAULT_MAX_IN_FLIGHT = 4 # concurrent requests to boxofficemojo.com
+DEFAULT_MIN_INTERVAL = 0.5 # seconds between the starts of two requests to boxofficemojo.com
+
+
+class HostLimiter:
+    """
+    Politeness limits for requests to one host, shared by all scraping threads.
+
+    At most `max_in_flight` requests are open at a time and consecutive requests start at least
+    `min_interval` seconds apart. Use as a context manager around each request.
+    """
+
+    def __init__(self, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, min_interval: float = DEFAULT_MIN_INTERVAL):
+        """
+        Args:
+            max_in_flight (int): Maximum number of concurrent requests. Default is 4.
+            min_interval (float): Minimum number of seconds between the starts of two requests. Default is 0.5.
+        """
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._interval_lock = threading.Lock()
+        self._min_interval = min_interval
+        self._next_start = 0.0
+
+    def __enter__(self):
+        self._slots.acquire()
+        with self._interval_lock:
+            now = time.monotonic()
+            wait = self._next_start - now
+            self._next_start = max(now, self._next_start) + self._min_interval
+        if wait > 0:
+            time.sleep(wait)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._slots.release()
+        return False
@@ -0,0 +1,73 @@
+from bs4 import BeautifulSoup, SoupStrainer
+try:
+    import lxml.html
+except ImportError: # lxml is optional, the bs4 backend is used without it
+    lxml = None
+
+RESULTS_TABLE_CLASS = "mojo-body-table"
+PARSER_BACKENDS = ("lxml", "bs4")
+DEFAULT_PARSER = "lxml" if lxml is not None else "bs4"
+
+
+def _bs4_is_hidden(cell) -> bool:
+    """Returns True if an attribute of the cell or of one of its descendants mentions "hidden"."""
+    for element in [cell, *cell.find_all(True)]:
+        for value in element.attrs.values():
+            if "hidden" in (" ".join(value) if isinstance(value, list) else value):
+                return True
+    return False
+
+
+def _lxml_is_hidden(cell) -> bool:
+    """Returns True if an attribute of the cell or of one of its descendants mentions "hidden"."""
+    return any("hidden" in value for element in cell.iter() for value in element.attrib.values())
+
+
+def _parse_bs4(html: str):
+    # only tables are built into a tree, the rest of the page is skipped while parsing
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("table"))
+    table = soup.find("table", RESULTS_TABLE_CLASS)
+    if table is None:
+        return None
+    rows = table.find_all("tr")
+    if not rows:
+        return [], []
+    headers = [th.get_text().replace("\n", "") for th in rows[0].find_all("th") if not _bs4_is_hidden(th)]
+    body = [[td.get_text().replace("\n", "") for td in row.find_all("td") if not _bs4_is_hidden(td)] for row in rows[1:]]
+    return headers, body
+
+
+def _parse_lxml(html: str):
+    tables = lxml.html.fromstring(html).xpath(
+        f"//table[contains(concat(' ', normalize-space(@class), ' '), ' {RESULTS_TABLE_CLASS} ')]")
+    if not tables:
+        return None
+    rows = tables[0].xpath(".//tr")
+    if not rows:
+        return [], []
+    headers = [th.text_content().replace("\n", "") for th in rows[0].iter("th") if not _lxml_is_hidden(th)]
+    body = [[td.text_content().replace("\n", "") for td in row.iter("td") if not _lxml_is_hidden(td)] for row in rows[1:]]
+    return headers, body
+
+
+def parse_results_table(html: str, backend: str = DEFAULT_PARSER):
+    """
+    Extracts the results table (`mojo-body-table`) of a BoxOfficeMojo page.
+
+    Hidden cells are skipped by reading the cell attributes directly, without serialising the cells back to HTML.
+
+    Args:
+        html (str): The page HTML.
+        backend (str): "lxml" (default when lxml is installed) or "bs4" (BeautifulSoup with html.parser).
+
+    Returns:
+        tuple or None: (headers, rows), the header texts and the list of cell texts of each body row,
+        or None if the page has no results table.
+    """
+    if backend == "lxml":
+        if lxml is None:
+            raise ImportError("The lxml parser backend requires the lxml package")
+        return _parse_lxml(html)
+    if backend == "bs4":
+        return _parse_bs4(html)
+    raise ValueError(f"Unknown parser backend {backend!r}, expected one of {PARSER_BACKENDS}")
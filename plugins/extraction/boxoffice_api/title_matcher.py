@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_DAYS_DIFF = 50 # increasing days diff increases uncertainty of correct matches
+
+
+def _to_days(dates) -> np.ndarray:
+    """Converts dates to float days since epoch, NaN for missing dates."""
+    days = (pd.to_datetime(pd.Series(dates, dtype=object)) - pd.Timestamp(0)) / pd.Timedelta(days=1)
+    return days.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def match_nearest_release(boxoffice_df: pd.DataFrame, tmdb_df: pd.DataFrame, max_days_diff: int = DEFAULT_MAX_DAYS_DIFF) -> pd.DataFrame:
+    """
+    Matches box office rows to TMDB movies of the same cleaned title with the nearest release date.
+
+    TMDB movies are indexed by cleaned title with sorted release dates, and each box office row is resolved with
+    a binary search around its likely release date, so time and memory stay linear in the input size
+    (no title x title product is built). Like the previous many-to-many merge, ties go to the TMDB movie listed
+    first, and only one row is kept per title and week end date.
+
+    Args:
+        boxoffice_df (pd.DataFrame): Box office rows with `title_cleaned`, `week_end_date` and `likely_release_date` columns.
+        tmdb_df (pd.DataFrame): TMDB movies with `id`, `title`, `title_cleaned` and `release_date` columns.
+        max_days_diff (int): Maximum number of days between the likely and the actual release date of a match. Default is 50.
+
+    Returns:
+        pd.DataFrame: The matched box office rows, with the `id`, `title`, `release_date` and `days_diff` of their movie.
+    """
+    tmdb = tmdb_df.reset_index(drop=True)
+    tmdb_days = _to_days(tmdb["release_date"])
+    has_date = ~np.isnan(tmdb_days)
+
+    # index: title codes shared by both frames, TMDB rows sorted by (title, release date, original order)
+    codes, _ = pd.factorize(pd.concat([tmdb["title_cleaned"], boxoffice_df["title_cleaned"]], ignore_index=True))
+    tmdb_codes, query_codes = codes[:len(tmdb)], codes[len(tmdb):]
+    positions = np.flatnonzero(has_date & (tmdb_codes >= 0))
+    positions = positions[np.lexsort((positions, tmdb_days[positions], tmdb_codes[positions]))]
+    index_codes, index_days = tmdb_codes[positions], tmdb_days[positions]
+
+    query_days = _to_days(boxoffice_df["likely_release_date"])
+    days_diff = np.full(len(query_codes), np.inf)
+    best = np.zeros(len(query_codes), dtype=np.int64)
+    if len(positions):
+        # (title, date) keys are sortable as one number, titles are 1e6 days apart
+        index_keys, query_keys = index_codes * 1e6 + index_days, query_codes * 1e6 + query_days
+        # nearest candidates: the first release of the last day on or before the likely release date, and the next release after it
+        next_release = np.searchsorted(index_keys, query_keys, side="right")
+        last = len(positions) - 1
+        before = np.searchsorted(index_keys, index_keys[np.clip(next_release - 1, 0, last)], side="left")
+        after = np.clip(next_release, 0, last)
+        before_ok = (next_release > 0) & (index_codes[before] == query_codes)
+        after_ok = (next_release <= last) & (index_codes[after] == query_codes)
+        before_diff = np.where(before_ok, np.abs(query_days - index_days[before]), np.inf)
+        after_diff = np.where(after_ok, np.abs(index_days[after] - query_days), np.inf)
+        # ties go to the movie listed first, as in the merge
+        pick_after = (after_diff < before_diff) | ((after_diff == before_diff) & (positions[after] < positions[before]))
+        best = np.where(pick_after, after, before)
+        days_diff = np.minimum(before_diff, after_diff)
+
+    matched = np.flatnonzero(days_diff <= max_days_diff)
+    result = boxoffice_df.iloc[matched].copy()
+    movies = tmdb.loc[positions[best[matched]], ["id", "title", "release_date"]]
+    result["id"] = movies["id"].to_numpy()
+    result["title"] = movies["title"].to_numpy()
+    result["release_date"] = pd.to_datetime(movies["release_date"]).to_numpy()
+    result["days_diff"] = days_diff[matched].astype(int)
+
+    # one row per title and week: the box office row with the closest match, the first one on ties
+    order = np.argsort(result["days_diff"].to_numpy(), kind="stable")
+    kept = ~result.iloc[order].duplicated(subset=["title_cleaned", "week_end_date"], keep="first").to_numpy()
+    return result.iloc[np.sort(order[kept])]
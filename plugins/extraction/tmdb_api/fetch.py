@@ -0,0 +1,207 @@
+import os
+import json
+import logging
+import threading
+import concurrent.futures
+from itertools import islice
+from datetime import date, timedelta
+from urllib.parse import urlencode
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+from extraction.tmdb_api.response_cache import TMDBResponseCache
+
+TMDB_BASE_URL = "https://api.themoviedb.org/3"
+DEFAULT_MAX_WORKERS = 16
+TMDB_MAX_CHANGES_DAYS = 14 # changes feeds reject windows longer than 14 days
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))),
+                                  "historical_data", "cache", "tmdb_response_cache.sqlite")
+
+_session = None
+_session_pool_size = 0
+_session_lock = threading.Lock()
+
+
+def get_tmdb_session(max_workers: int = DEFAULT_MAX_WORKERS) -> requests.Session:
+    """
+    Returns the process-wide TMDB session, creating it on first use.
+
+    The session keeps connections alive between requests, so concurrent workers reuse pooled
+    TCP/TLS connections instead of opening a new one per id. 429 and 5xx responses are retried
+    with backoff, honouring TMDB's Retry-After header.
+
+    Args:
+        max_workers (int): Number of concurrent workers that will share the session. The connection
+            pool is grown to at least this size.
+
+    Returns:
+        requests.Session: Session with TMDB authorization headers set.
+    """
+    global _session, _session_pool_size
+    with _session_lock:
+        if _session is None:
+            load_dotenv()
+            AUTHORIZATION = os.getenv("AUTHORIZATION")
+            _session = requests.Session()
+            _session.headers.update({
+                "accept": "application/json",
+                "Authorization": f"Bearer {AUTHORIZATION}"
+            })
+        if max_workers > _session_pool_size:
+            retry = Retry(total=5, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504],
+                          allowed_methods=["GET"], respect_retry_after_header=True, raise_on_status=False)
+            _session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=retry))
+            _session_pool_size = max_workers
+    return _session
+
+
+def tmdb_get(path: str, params: dict = None, session: requests.Session = None, cache: TMDBResponseCache = None) -> dict:
+    """
+    Sends one GET request to the TMDB API.
+
+    With a response cache, the request is made conditional on the cached ETag / Last-Modified,
+    and the cached body is reused when TMDB answers 304 Not Modified.
+
+    Args:
+        path (str): Endpoint path relative to the API root, e.g. "/movie/550".
+        params (dict, optional): Query string parameters.
+        session (requests.Session, optional): Session to use. Defaults to the shared TMDB session.
+        cache (TMDBResponseCache, optional): Response cache to revalidate against.
+
+    Returns:
+        dict: The decoded JSON response.
+    """
+    session = session or get_tmdb_session()
+    headers = {}
+    if cache is not None:
+        cache_key = f"{path}?{urlencode(sorted((params or {}).items()))}"
+        headers = cache.conditional_headers(cache_key)
+
+    response = session.get(f"{TMDB_BASE_URL}{path}", params=params, headers=headers)
+    if response.status_code == 304 and cache is not None:
+        body = cache.get(cache_key)
+        if body is not None:
+            return json.loads(body)
+        # Entry evicted between the two lookups, fetch it again unconditionally
+        return tmdb_get(path, params, session)
+    if response.status_code != 200:
+        raise Exception("Unable to retrieve TMDB data")
+    if cache is not None:
+        cache.put(cache_key, response.content, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return response.json()
+
+
+def fetch_tmdb_many(ids, path_template: str, params: dict = None, max_workers: int = DEFAULT_MAX_WORKERS, id_param: str = None,
+                    cache: TMDBResponseCache = None):
+    """
+    Fetches one TMDB endpoint for many ids concurrently and yields results as they complete.
+
+    At most `2 * max_workers` requests are in flight at any time, so memory stays flat no matter
+    how many ids are passed in. Results are yielded in completion order, not input order.
+
+    Args:
+        ids (iterable): Ids to substitute into `path_template`.
+        path_template (str): Endpoint path with an `{id}` placeholder, e.g. "/movie/{id}".
+        params (dict, optional): Query string parameters sent with every request.
+        max_workers (int): Number of concurrent requests. Default is 16.
+        id_param (str, optional): If given, each id is sent as this query string parameter (e.g. "page")
+            instead of being substituted into `path_template`.
+        cache (TMDBResponseCache, optional): Response cache used to send conditional requests.
+
+    Yields:
+        tuple: (id, dict) pairs of the requested id and its decoded JSON response.
+    """
+    session = get_tmdb_session(max_workers)
+    ids = iter(ids)
+    logging.info(f"Start fetching {path_template} with {max_workers} workers")
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = {}
+
+        def submit(n):
+            for id_ in islice(ids, n):
+                if id_param:
+                    future = executor.submit(tmdb_get, path_template, {**(params or {}), id_param: id_}, session, cache)
+                else:
+                    future = executor.submit(tmdb_get, path_template.format(id=id_), params, session, cache)
+                in_flight[future] = id_
+
+        submit(2 * max_workers)
+        while in_flight:
+            done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                id_ = in_flight.pop(future)
+                yield id_, future.result()
+            submit(len(done))
+
+
+def fetch_tmdb_pages(path: str, params: dict = None, max_workers: int = DEFAULT_MAX_WORKERS, first_page: dict = None,
+                     max_pages: int = None):
+    """
+    Fetches every page of a paged TMDB endpoint. Page 1 is fetched first to read `total_pages`,
+    then the remaining pages are fetched concurrently.
+
+    Args:
+        path (str): Endpoint path relative to the API root, e.g. "/movie/changes".
+        params (dict, optional): Query string parameters sent with every page.
+        max_workers (int): Number of concurrent requests. Default is 16.
+        first_page (dict, optional): Already fetched page 1, to avoid requesting it again.
+        max_pages (int, optional): Stop after this many pages.
+
+    Yields:
+        list: The `results` list of each page, in completion order.
+    """
+    if first_page is None:
+        first_page = tmdb_get(path, params={**(params or {}), "page": 1})
+    total_pages = first_page.get("total_pages", 1)
+    if max_pages is not None:
+        total_pages = min(total_pages, max_pages)
+
+    yield first_page["results"]
+    for _, data_dict in fetch_tmdb_many(range(2, total_pages + 1), path, params=params, max_workers=max_workers, id_param="page"):
+        yield data_dict["results"]
+
+
+def get_tmdb_changed_ids(media: str, start_date: date, end_date: date, max_workers: int = DEFAULT_MAX_WORKERS) -> set:
+    """
+    Retrieves the ids TMDB reports as changed in a date window, from the global changes feed
+    (e.g. /movie/changes). The feed only accepts windows of up to 14 days, so longer windows are split.
+
+    Args:
+        media (str): "movie", "person" or "tv".
+        start_date (date): Start of the window (inclusive).
+        end_date (date): End of the window (inclusive).
+        max_workers (int): Number of concurrent requests. Default is 16.
+
+    Returns:
+        set: The changed ids as integers.
+    """
+    changed_ids = set()
+    window_start = start_date
+    while window_start <= end_date:
+        window_end = min(window_start + timedelta(days=TMDB_MAX_CHANGES_DAYS - 1), end_date)
+        params = {"start_date": window_start.strftime("%Y-%m-%d"), "end_date": window_end.strftime("%Y-%m-%d")}
+        for results in fetch_tmdb_pages(f"/{media}/changes", params=params, max_workers=max_workers):
+            changed_ids.update(int(result["id"]) for result in results)
+        window_start = window_end + timedelta(days=1)
+    print(f"Number of changed {media} IDs from {start_date} to {end_date}: {len(changed_ids)}")
+    return changed_ids
+
+
+def write_ndjson(ndjson_file, records) -> int:
+    """
+    Writes records to an open file as NDJSON, one record per line.
+
+    Args:
+        ndjson_file (file object): File opened for writing text.
+        records (iterable): Iterable of JSON serialisable records. Consumed lazily.
+
+    Returns:
+        int: Number of records written.
+    """
+    count = 0
+    for record in records:
+        ndjson_file.write(json.dumps(record) + "\n")
+        count += 1
+    return count
@@ -0,0 +1,115 @@
+import os
+import time
+import zlib
+import sqlite3
+import threading
+
+DEFAULT_MAX_CACHE_BYTES = 2 * 1024 ** 3 # 2 GiB of compressed bodies
+
+
+class TMDBResponseCache:
+    """
+    Persistent on-disk cache of TMDB responses, used to send conditional requests.
+
+    Each entry stores the ETag / Last-Modified validators and the (zlib compressed) body of a response,
+    keyed by endpoint path and query string. When the total size of stored bodies exceeds `max_bytes`,
+    the least recently used entries are evicted.
+    """
+
+    def __init__(self, db_path: str, max_bytes: int = DEFAULT_MAX_CACHE_BYTES):
+        """
+        Opens (and creates if needed) the cache database.
+
+        Args:
+            db_path (str): Path of the SQLite file backing the cache.
+            max_bytes (int): Upper bound on the total size of stored bodies, in bytes. Default is 2 GiB.
+        """
+        folder_path = os.path.dirname(db_path)
+        if folder_path and not os.path.exists(folder_path):
+            os.makedirs(folder_path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def conditional_headers(self, key: str) -> dict:
+        """
+        Returns the If-None-Match / If-Modified-Since headers for a cached response.
+
+        Args:
+            key (str): Cache key of the request.
+
+        Returns:
+            dict: Request headers, empty if the response is not cached.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT etag, last_modified FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return {}
+        headers = {}
+        if row[0]:
+            headers["If-None-Match"] = row[0]
+        if row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def get(self, key: str):
+        """
+        Returns a cached body and marks it as recently used.
+
+        Args:
+            key (str): Cache key of the request.
+
+        Returns:
+            bytes or None: The response body, or None if it is not cached.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return zlib.decompress(row[0])
+
+    def put(self, key: str, body: bytes, etag: str = None, last_modified: str = None):
+        """
+        Stores a response, then evicts least recently used entries while the cache is over `max_bytes`.
+
+        Responses without an ETag or Last-Modified header cannot be revalidated, so they are not stored.
+
+        Args:
+            key (str): Cache key of the request.
+            body (bytes): Raw response body.
+            etag (str, optional): ETag header of the response.
+            last_modified (str, optional): Last-Modified header of the response.
+        """
+        if not etag and not last_modified:
+            return
+        compressed = zlib.compress(body)
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, etag, last_modified, body, size, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, etag, last_modified, compressed, len(compressed), time.time()))
+            self._total_bytes += len(compressed) - (previous[0] if previous else 0)
+            while self._total_bytes > self.max_bytes:
+                key_to_evict, size = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access LIMIT 1").fetchone()
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key_to_evict,))
+                self._total_bytes -= size
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,98 @@
+import os
+import json
+from pathlib import Path
+from googlecloud.compression import compressed_name, open_raw_file
+from googlecloud.columnar import write_parquet_copy, parquet_name
+
+DEFAULT_SHARD_SIZE = 1000
+
+
+def manifest_path(folder_path: str, name: str) -> str:
+    """Returns the path of the manifest listing the ids already written to `name`'s shards."""
+    return os.path.join(folder_path, f"{name}.manifest")
+
+
+def read_manifest(folder_path: str, name: str) -> set:
+    """
+    Reads the ids whose records are already written to completed shards.
+
+    Args:
+        folder_path (str): Directory holding the shards.
+        name (str): Base name of the shards, e.g. "raw_movie_details_20210101_20240331".
+
+    Returns:
+        set: The completed ids as strings.
+    """
+    path = manifest_path(folder_path, name)
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def write_ndjson_shards(folder_path: str, name: str, fetched, shard_size: int = DEFAULT_SHARD_SIZE, compress: bool = True, parquet: bool = True) -> int:
+    """
+    Streams fetched records into numbered NDJSON shards (`{name}_part00000.ndjson.gz`, ...).
+
+    Each shard is written to a temporary file and renamed once it is complete, then its ids are appended
+    to the manifest right away, before its Parquet copy (if any) is written. A run that fails part-way therefore
+    keeps every completed shard, and only the records of the shard in progress have to be fetched again.
+    Parquet copies missing from completed shards (e.g. after a crash while writing one) are written on resume.
+
+    Args:
+        folder_path (str): Directory where the shards are written.
+        name (str): Base name of the shards.
+        fetched (iterable): Iterable of (id, record) pairs. Consumed lazily.
+        shard_size (int): Number of records per shard. Default is 1000.
+        compress (bool): If True, shards are gzip compressed. Default is True.
+        parquet (bool): If True, a Parquet copy of each shard is written next to it. Default is True.
+
+    Returns:
+        int: Number of records written.
+    """
+    folder = Path(folder_path)
+    folder.mkdir(parents=True, exist_ok=True)
+    for leftover in folder.glob(f"{name}_part*.tmp"):
+        leftover.unlink() # shard of a failed run, its ids are not in the manifest
+    existing_shards = list(folder.glob(f"{name}_part*.ndjson*"))
+    if parquet:
+        for shard_path in existing_shards:
+            if not (folder / parquet_name(shard_path.name)).exists():
+                write_parquet_copy(str(shard_path))
+    existing_parts = [int(path.name[len(name) + len("_part"):].split(".")[0]) for path in existing_shards]
+    part = max(existing_parts, default=-1) + 1
+    extension = compressed_name(".ndjson") if compress else ".ndjson"
+
+    count = 0
+    shard_ids = []
+    shard_file = None
+    try:
+        for id_, record in fetched:
+            if shard_file is None:
+                shard_path = folder / f"{name}_part{part:05d}{extension}"
+                shard_file = open_raw_file(f"{shard_path}.tmp", compress=compress)
+            shard_file.write(json.dumps(record) + "\n")
+            shard_ids.append(str(id_))
+            count += 1
+            if len(shard_ids) >= shard_size:
+                _complete_shard(folder_path, name, shard_file, shard_path, shard_ids, parquet)
+                shard_file, shard_ids = None, []
+                part += 1
+        if shard_file is not None:
+            _complete_shard(folder_path, name, shard_file, shard_path, shard_ids, parquet)
+            shard_file = None
+    finally:
+        if shard_file is not None:
+            shard_file.close()
+    return count
+
+
+def _complete_shard(folder_path: str, name: str, shard_file, shard_path: Path, shard_ids: list, parquet: bool):
+    shard_file.close()
+    os.replace(f"{shard_path}.tmp", shard_path)
+    # record the ids as soon as the shard is in place, so a crash afterwards never fetches them into a second shard
+    with open(manifest_path(folder_path, name), "a") as f:
+        f.write("\n".join(shard_ids) + "\n")
+    if parquet:
+        write_parquet_copy(str(shard_path))
+    print(f"{shard_path} completed ({len(shard_ids)} records)")
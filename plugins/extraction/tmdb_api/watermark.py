@@ -0,0 +1,58 @@
+import os
+import json
+import tempfile
+from datetime import date
+from google.api_core.exceptions import NotFound
+from googlecloud.read_data_gcs import read_blob
+from googlecloud.upload_initial_data_gcs import upload_blob
+
+# Kept in Google Cloud Storage so every worker sees the same watermarks
+WATERMARK_BUCKET = "update_movies_tmdb"
+WATERMARK_BLOB = "tmdb_sync_watermarks.json"
+
+
+def _read_watermarks(bucket_name: str, blob_name: str) -> dict:
+    try:
+        return read_blob(bucket_name, blob_name, json_as_dict=True)
+    except NotFound:
+        return {}
+
+
+def read_watermark(name: str, bucket_name: str = WATERMARK_BUCKET, blob_name: str = WATERMARK_BLOB):
+    """
+    Reads the date up to which a TMDB changes feed was last synced and loaded.
+
+    Args:
+        name (str): Name of the feed, e.g. "movie".
+        bucket_name (str): Bucket holding the watermarks.
+        blob_name (str): Name of the JSON blob holding the watermarks.
+
+    Returns:
+        date or None: The last synced date, or None if the feed was never synced.
+    """
+    watermarks = _read_watermarks(bucket_name, blob_name)
+    return date.fromisoformat(watermarks[name]) if name in watermarks else None
+
+
+def write_watermark(name: str, synced_until: date, bucket_name: str = WATERMARK_BUCKET, blob_name: str = WATERMARK_BLOB):
+    """
+    Records the date up to which a TMDB changes feed has been synced. Only call it once the changes have been
+    loaded into BigQuery, the next run starts its changes window from this date.
+
+    Args:
+        name (str): Name of the feed, e.g. "movie".
+        synced_until (date): Last date (inclusive) whose changes have been loaded.
+        bucket_name (str): Bucket holding the watermarks.
+        blob_name (str): Name of the JSON blob holding the watermarks.
+
+    Returns:
+        None
+    """
+    watermarks = _read_watermarks(bucket_name, blob_name)
+    watermarks[name] = synced_until.isoformat()
+
+    with tempfile.TemporaryDirectory() as folder_path:
+        file_path = os.path.join(folder_path, blob_name)
+        with open(file_path, "w") as f:
+            json.dump(watermarks, f)
+        upload_blob(bucket_name, file_path, blob_name)
@@ -1,91 +1,43 @@
 import sys
 from pathlib import Path
 import pandas as pd
-import numpy as np
 import os
 from datetime import date, datetime
 from googlecloud.read_data_gcs import read_blob, list_blobs
 from googlecloud.upload_initial_data_gcs import delete_many_blobs, upload_many_blobs_with_transfer_manager, upload_blob
 from googlecloud.read_data_bigquery import load_data_from_table
-from dotenv import load_dotenv
+from google.cloud import bigquery
+from googlecloud.compression import compressed_name, open_raw_file
+from extraction.tmdb_collection.collection_index import read_collection_id_index
+from extraction.tmdb_collection.transform import transform_collection_records, DEFAULT_CUTOFF_YEAR
+from extraction.tmdb_api.fetch import fetch_tmdb_many, DEFAULT_MAX_WORKERS
 import logging
-import requests
 from importlib import reload
-import concurrent.futures
 import json
 import shutil
 
 
-def get_tmdb_collection_id_gcs() -> pd.Series:
+def fetch_collection_details(collection_ids, max_workers: int = DEFAULT_MAX_WORKERS) -> dict:
     """
-    Retrieves the TMDB collection IDs from files stored in Google Cloud Storage (GCS).
-
-    Returns:
-        pd.Series: A pandas Series containing the TMDB collection IDs as integers.
-    """
-    bucket_name = "movies_tmdb"
-    filenames = list_blobs("movies_tmdb", prefix="raw_movie_details")
-    interested_col = ['belongs_to_collection']
-    df =  pd.DataFrame()
-    #read file from gcs and get interested col
-    for filename in filenames:
-        file_content = read_blob(bucket_name, filename)[interested_col]
-        file_content = file_content.dropna()
-        df = pd.concat([df, file_content], axis=0)
-    return pd.json_normalize(df['belongs_to_collection'])["id"].astype(int)
-
-def chunks(series: pd.Series, length_pieces: int = 20):
-    """
-    Splits a pandas Series into chunks of specified length.
-
-    Parameters:
-        series (pd.Series): The pandas Series to be split into chunks.
-        length_pieces (int): The length of each chunk. Default is 20.
-
-    Returns:
-        list: A list of pandas Series, where each Series represents a chunk of the original Series.
-    """
-    indices = []
-    counter = 0
-    while len(indices) < len(series):
-        indices.extend([counter] * length_pieces)
-        counter += 1
-
-    indices = np.array(indices)[:len(series)]
-    return [series.loc[indices == i] for i in np.unique(indices)]
-
-def collection_info_chunks(chunk:list):
-    """
-    Retrieves detailed information about movie collections from the TMDB API for one chunk of collection ids.
+    Retrieves detailed information about movie collections from the TMDB API, using the shared fetch engine.
 
     Args:
-        chunks (list): A list of series of collection IDs.
+        collection_ids (iterable): Collection IDs to fetch.
+        max_workers (int): Number of concurrent requests. Default is 16.
 
     Returns:
         dict: A dictionary containing the collection ID as the key and the collection data as the value.
     """
-    load_dotenv()
-    AUTHORIZATION = os.getenv("AUTHORIZATION") 
-    headers = {
-        "accept": "application/json",
-        "Authorization": AUTHORIZATION
-    }
-    logging.info("Start Thread")
-    responses = {}
-    for collection_id in chunk:
-        url = f"https://api.themoviedb.org/3/collection/{collection_id}?language=en-US"
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            collection_data = response.json()
-            responses[collection_id] = collection_data
-        else:
-            raise Exception("Unable to retrieve TMDB data")
-    return responses
+    params = {"language": "en-US"}
+    return {int(collection_id): collection_data
+            for collection_id, collection_data in fetch_tmdb_many(collection_ids, "/collection/{id}", params=params, max_workers=max_workers)}
 
 def get_initial_collection_tmdb_details(file_path):
     """
     Retrieves collection details for all collection ids from TMDB API and saves the results to a JSON file.
 
+    The collection ids are read from the collection id index written when movie raw data is cleaned.
+
     Args:
         file_path (str): The file path where the JSON file will be saved.
 
@@ -93,24 +45,18 @@ def get_initial_collection_tmdb_details(file_path):
         None
     """
     reload(logging)
-    collection_ids = get_tmdb_collection_id_gcs().drop_duplicates()
-    chunks_list = chunks(collection_ids)
-    collection_results = {}
-
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        results = executor.map(collection_info_chunks, chunks_list)
-
-    for result in results:
-        collection_results.update(result)
+    collection_ids = read_collection_id_index()
+    collection_results = fetch_collection_details(collection_ids)
 
     folder_path = file_path
     if not os.path.exists(folder_path):
         os.makedirs(folder_path)
 
-    with open(os.path.join(folder_path, "raw_collection_data.json"), "w") as f:
+    filename = compressed_name("raw_collection_data.json")
+    with open_raw_file(os.path.join(folder_path, filename)) as f:
         json.dump(collection_results, f)
     
-    print(os.path.join(folder_path, "raw_collection_data.json"))
+    print(os.path.join(folder_path, filename))
 
 def upload_raw_initial_collection_tmdb_details_gcs():
     script_dir = os.path.dirname(os.path.realpath(__file__))
@@ -125,7 +71,7 @@ def upload_raw_initial_collection_tmdb_details_gcs():
         historicaldata_dir = os.path.join(os.path.dirname(plugins_dir), "historical_data") 
         str_directory = os.path.join(historicaldata_dir, 'raw_historical_data/tmdb_collection')
         directory = Path(str_directory)
-        filenames = list([file.name for file in directory.glob('*.json')])
+        filenames = list([file.name for file in [*directory.glob('*.json'), *directory.glob('*.json.gz')]])
         delete_many_blobs(bucket_name, filenames)
         print(f"{filenames=}")
         upload_many_blobs_with_transfer_manager(bucket_name, filenames=filenames, source_directory=str_directory)
@@ -141,13 +87,13 @@ def get_raw_initial_collection_tmdb_details_gcs():
         collection_results.update(file_content)
     return collection_results
 
-def clean_raw_collections_details(save_file_path:str, return_df=False):
+def clean_raw_collections_details(save_file_path:str, return_df=False, cutoff_year: int = DEFAULT_CUTOFF_YEAR):
     """
     Cleans the raw collection details from json file and saves the cleaned results to a CSV file.
 
     Args:
-        raw_file_path (str): The file path of the raw collection details JSON file.
         save_file_path (str): The directory path where the cleaned CSV file will be saved.
+        cutoff_year (int): Only movies released before this year are counted. Default is 2020.
 
     Returns:
         filepath (str) or dataframe (pd.Dataframe)
@@ -155,17 +101,7 @@ def clean_raw_collections_details(save_file_path:str, return_df=False):
 
     collection_results = get_raw_initial_collection_tmdb_details_gcs()
 
-    cleaned_results = []
-    for key, items in collection_results.items():
-        parts_interest =[part for part in items["parts"] if part["media_type"] == "movie" and part["release_date"] != "" and datetime.strptime(part["release_date"], "%Y-%m-%d").year < 2020]
-        if len(parts_interest) > 0:
-            avg_popularity_before_2020 = sum([part["popularity"] for part in parts_interest]) / len(parts_interest)
-        else:
-            avg_popularity_before_2020 = None
-        cleaned_results.append((items["id"], items["name"].strip(), len(parts_interest), avg_popularity_before_2020))
-
-    cleaned_df = pd.DataFrame(cleaned_results, 
-                            columns=["collection_id", "name", "number_movies_before_2020", "avg_popularity_before_2020"])
+    cleaned_df = transform_collection_records(collection_results, cutoff_year=cutoff_year)
     if not return_df:
         folder_path = save_file_path
         if not os.path.exists(folder_path):
@@ -178,20 +114,26 @@ def clean_raw_collections_details(save_file_path:str, return_df=False):
 #### Functions for updating
 
 def collection_ids_to_update() -> pd.Series:
+    """
+    Retrieves the collection IDs in movie table stored in BigQuery that are not yet in the collection table.
+
+    Returns:
+        pd.Series: A pandas Series containing the new TMDB collection IDs as integers.
+    """
     query_movie = '''
     SELECT DISTINCT CAST(collection_id AS INT64) AS collection_id
     FROM `is3107-418809.movie_dataset.movie`
     WHERE collection_id IS NOT NULL;
     '''
     collection_movie = load_data_from_table(query_movie)
-    collection_movie_set = set(collection_movie)
+    collection_movie_set = set(collection_movie['collection_id'])
                                
     query_collection = '''
     SELECT collection_id
     FROM `is3107-418809.movie_dataset.collection`
     '''
     now_collection = load_data_from_table(query_collection)
-    now_collection_set = set(now_collection)  
+    now_collection_set = set(now_collection['collection_id'])
 
     #return those those in movie table that does not exist in collection table
     #The difference() method returns a set that contains the difference between two sets. As a shortcut, you can use the - operator instead.
@@ -200,6 +142,27 @@ def collection_ids_to_update() -> pd.Series:
 
     return pd.Series(list(difference))
 
+def changed_collection_ids_to_refresh(movie_collection_ids: list) -> pd.Series:
+    """
+    Retrieves the collection IDs already in the collection table stored in BigQuery whose member movies were
+    added or updated in the current run, so that their aggregates can be refreshed.
+
+    Args:
+        movie_collection_ids (list): Collection IDs of the movies upserted in the current run.
+
+    Returns:
+        pd.Series: A pandas Series containing the TMDB collection IDs to refresh as integers.
+    """
+    query_collection = '''
+    SELECT DISTINCT collection_id
+    FROM `is3107-418809.movie_dataset.collection`
+    WHERE collection_id IN UNNEST(@collection_ids)
+    '''
+    changed_collection = load_data_from_table(query_collection, query_parameters=[
+        bigquery.ArrayQueryParameter("collection_ids", "INT64", sorted({int(collection_id) for collection_id in movie_collection_ids}))])
+    print(f"Number of existing collections with new or updated movies: {len(changed_collection)}")
+    return pd.Series(changed_collection['collection_id'], dtype="int64").reset_index(drop=True)
+
 
 def get_collection_tmdb_details(collection_ids):
     """
@@ -211,14 +174,7 @@ def get_collection_tmdb_details(collection_ids):
     Returns:
         None
     """
-    chunks_list = chunks(collection_ids)
-    collection_results = {}
-
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        results = executor.map(collection_info_chunks, chunks_list)
-
-    for result in results:
-        collection_results.update(result)
+    collection_results = fetch_collection_details(collection_ids)
     
     #to keep a copy to google cloud storage
     script_dir = os.path.dirname(os.path.realpath(__file__))
@@ -234,12 +190,12 @@ def get_collection_tmdb_details(collection_ids):
     if not os.path.exists(folder_path):
         os.makedirs(folder_path)
     date_now = datetime.now().date()
-    with open(os.path.join(folder_path, f"update_raw_collection_data_{date_now}.json"), "w") as f:
+    filename = compressed_name(f"update_raw_collection_data_{date_now}.json")
+    with open_raw_file(os.path.join(folder_path, filename)) as f:
         json.dump(collection_results, f)
 
     try:   
         bucket_name = "update_movies_tmdb"
-        filename = f"update_raw_collection_data_{date_now}.json"
         upload_blob(bucket_name, source_file_name = os.path.join(folder_path, filename), destination_blob_name=filename)
         #remove directory after upload
         if os.path.exists(folder_path):
@@ -250,28 +206,20 @@ def get_collection_tmdb_details(collection_ids):
     return collection_results
 
 
-def clean_update_collections_details(collection_results:dict, save_file_path:str, return_df=False):
+def clean_update_collections_details(collection_results:dict, save_file_path:str, return_df=False,
+                                     cutoff_year: int = DEFAULT_CUTOFF_YEAR):
     """
     Cleans the raw collection details python dict and saves the cleaned results to a CSV file.
 
     Args:
-        raw_file_path (str): The file path of the raw collection details JSON file.
+        collection_results (dict): Raw collection details, keyed by collection id.
         save_file_path (str): The directory path where the cleaned CSV file will be saved.
+        cutoff_year (int): Only movies released before this year are counted. Default is 2020.
 
     Returns:
         filepath (str) or dataframe (pd.Dataframe)
     """
-    cleaned_results = []
-    for key, items in collection_results.items():
-        parts_interest =[part for part in items["parts"] if part["media_type"] == "movie" and part["release_date"] != "" and datetime.strptime(part["release_date"], "%Y-%m-%d").year < 2020]
-        if len(parts_interest) > 0:
-            avg_popularity_before_2020 = sum([part["popularity"] for part in parts_interest]) / len(parts_interest)
-        else:
-            avg_popularity_before_2020 = None
-        cleaned_results.append((items["id"], items["name"].strip(), len(parts_interest), avg_popularity_before_2020))
-
-    cleaned_df = pd.DataFrame(cleaned_results, 
-                              columns=["collection_id", "name", "number_movies_before_2020", "avg_popularity_before_2020"])
+    cleaned_df = transform_collection_records(collection_results, cutoff_year=cutoff_year)
     if not return_df:
         folder_path = save_file_path
         if not os.path.exists(folder_path):
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import pandas as pd
+from googlecloud.read_data_gcs import read_blob
+from googlecloud.upload_initial_data_gcs import upload_blob
+from googlecloud.read_data_bigquery import load_data_from_table
+
+COLLECTION_INDEX_BUCKET = "movies_tmdb"
+COLLECTION_INDEX_BLOB = "collection_id_index.csv"
+
+
+def read_collection_id_index() -> pd.Series:
+    """
+    Retrieves the TMDB collection IDs of all cleaned movies from the collection id index in Google Cloud Storage (GCS).
+
+    If the index has not been written yet, the collection IDs are read from the movie table in BigQuery instead.
+
+    Returns:
+        pd.Series: A pandas Series containing the unique TMDB collection IDs as integers.
+    """
+    try:
+        collection_ids = read_blob(COLLECTION_INDEX_BUCKET, COLLECTION_INDEX_BLOB)["collection_id"]
+    except Exception as e:
+        print(f"Collection id index not found, reading collection IDs from movie table \n Error details: {e}")
+        query_collection = '''
+        SELECT DISTINCT CAST(collection_id AS INT64) AS collection_id FROM `is3107-418809.movie_dataset.movie`
+        WHERE collection_id IS NOT NULL
+        '''
+        collection_ids = load_data_from_table(query_collection)["collection_id"]
+    return pd.Series(collection_ids, name="collection_id").dropna().astype(int).drop_duplicates().reset_index(drop=True)
+
+
+def update_collection_id_index(collection_ids: pd.Series, replace: bool = False):
+    """
+    Adds the collection IDs of newly cleaned movies to the collection id index in Google Cloud Storage (GCS).
+
+    Args:
+        collection_ids (pd.Series): Collection IDs of the cleaned movies, may contain missing values.
+        replace (bool): If True, the index is rebuilt from `collection_ids` only. Default is False.
+
+    Returns:
+        None
+    """
+    collection_ids = pd.Series(collection_ids, name="collection_id").dropna().astype(int)
+    if not replace:
+        try:
+            existing_ids = read_blob(COLLECTION_INDEX_BUCKET, COLLECTION_INDEX_BLOB)["collection_id"]
+            collection_ids = pd.concat([existing_ids, collection_ids], axis=0)
+        except Exception as e:
+            print(f"Collection id index not found, creating it \n Error details: {e}")
+    collection_ids = collection_ids.drop_duplicates().sort_values()
+
+    try:
+        with tempfile.TemporaryDirectory() as folder_path:
+            file_path = os.path.join(folder_path, COLLECTION_INDEX_BLOB)
+            collection_ids.to_frame(name="collection_id").to_csv(file_path, index=False)
+            upload_blob(COLLECTION_INDEX_BUCKET, file_path, COLLECTION_INDEX_BLOB)
+    except Exception as e:
+        print(f"Error in uploading collection id index to cloud storage \n Error details: {e}")
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+COLLECTION_COLUMNS = ["collection_id", "name", "number_movies_before_2020", "avg_popularity_before_2020"]
+DEFAULT_CUTOFF_YEAR = 2020
+
+
+def transform_collection_records(collection_results: dict, cutoff_year: int = DEFAULT_CUTOFF_YEAR) -> pd.DataFrame:
+    """
+    Cleans raw TMDB collection details into the columns of the collection table in one columnar pass.
+
+    The parts of all collections are flattened into arrays, their release dates parsed in bulk, and the number
+    of movies released before `cutoff_year` and their average popularity computed per collection with one
+    grouped reduction. Parts without a (valid) release date are not counted.
+
+    Args:
+        collection_results (dict): Raw TMDB collection details, keyed by collection id.
+        cutoff_year (int): Only movies released before this year are counted. Default is 2020.
+
+    Returns:
+        pd.DataFrame: The cleaned collection details, with columns in `COLLECTION_COLUMNS` order.
+    """
+    collections = list(collection_results.values())
+    n = len(collections)
+
+    # Flatten parts, remembering the position of the collection each part belongs to
+    parts_per_collection = [collection.get("parts") or [] for collection in collections]
+    lengths = np.fromiter((len(parts) for parts in parts_per_collection), dtype=np.int64, count=n)
+    owners = np.repeat(np.arange(n), lengths)
+    parts = [part for collection_parts in parts_per_collection for part in collection_parts]
+
+    media_types = np.array([part.get("media_type") for part in parts], dtype=object)
+    release_years = pd.to_datetime(pd.Series([part.get("release_date") or None for part in parts], dtype=object),
+                                   format="%Y-%m-%d", errors="coerce").dt.year.to_numpy()
+    popularity = np.array([part.get("popularity") for part in parts], dtype=float)
+
+    mask = (media_types == "movie") & (release_years < cutoff_year)
+    number_movies = np.bincount(owners[mask], minlength=n)
+    total_popularity = np.bincount(owners[mask], weights=popularity[mask], minlength=n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg_popularity = np.where(number_movies > 0, total_popularity / number_movies, np.nan)
+
+    return pd.DataFrame({
+        "collection_id": [collection["id"] for collection in collections],
+        "name": [collection["name"].strip() for collection in collections],
+        "number_movies_before_2020": number_movies,
+        "avg_popularity_before_2020": avg_popularity,
+    }, columns=COLLECTION_COLUMNS)
@@ -1,77 +1,95 @@
 import sys
 from pathlib import Path
 import pandas as pd
-import numpy as np
 import os
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from googlecloud.read_data_gcs import read_blob, list_blobs
 from googlecloud.upload_initial_data_gcs import delete_many_blobs, upload_many_blobs_with_transfer_manager, upload_blob
 from googlecloud.read_data_bigquery import load_data_from_table
-from dotenv import load_dotenv
+from googlecloud.compression import compressed_name, open_raw_file
+from googlecloud.columnar import write_parquet_copy, raw_blobs
+from extraction.tmdb_collection.collection_index import update_collection_id_index
+from extraction.tmdb_api.fetch import tmdb_get, fetch_tmdb_many, fetch_tmdb_pages, get_tmdb_changed_ids, write_ndjson, DEFAULT_MAX_WORKERS, DEFAULT_CACHE_PATH
+from extraction.tmdb_api.watermark import read_watermark, write_watermark
+from extraction.tmdb_api.shards import read_manifest, write_ndjson_shards, DEFAULT_SHARD_SIZE
+from extraction.tmdb_api.response_cache import TMDBResponseCache
+from extraction.tmdb_movie.transform import transform_movie_records, slim_movie_record
 import logging
-import requests
 from importlib import reload
-import concurrent.futures
-import json
 
-def get_tmdb_movie_id(start_release_date, end_release_date) -> pd.Series:
-    
-    load_dotenv()
-    AUTHORIZATION = os.getenv("AUTHORIZATION") 
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {AUTHORIZATION}"
+TMDB_MAX_PAGES = 500 # /discover only serves the first 500 pages of any query
+MOVIE_DETAILS_PARAMS = {"append_to_response": "credits,videos,release_dates,keywords", "language": "en-US"}
+
+def discover_movie_pages(start_release_date: str, end_release_date: str, max_workers: int = DEFAULT_MAX_WORKERS):
+    """
+    Walks TMDB /discover/movie for theatrically released movies in a release date window.
+
+    Page 1 is fetched first to read `total_pages`, then the remaining pages are fetched concurrently.
+    If the window has more pages than TMDB will serve, it is split in half and each half is discovered
+    recursively, so no ids are lost to the page cap.
+
+    Args:
+        start_release_date (str): Start of the window, in "YYYY-MM-DD" format (inclusive).
+        end_release_date (str): End of the window, in "YYYY-MM-DD" format (inclusive).
+        max_workers (int): Number of concurrent requests. Default is 16.
+
+    Yields:
+        list: The `results` list of each page.
+    """
+    params = {
+        "language": "en-US",
+        "primary_release_date.gte": start_release_date,
+        "primary_release_date.lte": end_release_date,
+        "sort_by": "primary_release_date.desc",
+        "with_release_type": 3
     }
-    
-    print(AUTHORIZATION)
-    url = 'https://api.themoviedb.org/3/discover/movie?language=en-US&page=1&primary_release_date.gte=' \
-    + start_release_date + '&primary_release_date.lte=' + end_release_date + '&sort_by=primary_release_date.desc&with_release_type=3'
-    
-    response = requests.get(url, headers=headers)
-    data_dict = json.loads(response.text)
-    print(data_dict)
-    
-    # Extract 'id' from 'results'
-    ids = pd.DataFrame.from_dict(data_dict['results'])[['id']]
-    
-    # Extract total_pages
-    total_pages = data_dict['total_pages']
-    print('total_pages: ' + str(total_pages))
-    
-    if total_pages > 2:
-        for page in range (2, total_pages + 1):
-            url = 'https://api.themoviedb.org/3/discover/movie?language=en-US&page=' + str(page) + '&primary_release_date.gte=' \
-            + start_release_date + '&primary_release_date.lte=' + end_release_date + '&sort_by=primary_release_date.desc&with_release_type=3'
-            response = requests.get(url, headers=headers)
-            data_dict = json.loads(response.text)
-            try:
-                # Extract 'id' from 'results' and concat
-                add_ids = pd.DataFrame.from_dict(data_dict['results'])[['id']]
-                ids = pd.concat([ids, add_ids], ignore_index=True)
-            except KeyError:
-                print("KeyError occurred!")
-                print("Contents of data_dict:", data_dict)
-    return ids["id"].astype(int)
-
-def chunks(series: pd.Series, length_pieces: int = 50):
+    first_page = tmdb_get("/discover/movie", params={**params, "page": 1})
+    total_pages = first_page["total_pages"]
+    print(f"{start_release_date} to {end_release_date} total_pages: {total_pages}")
+
+    start_date = date.fromisoformat(start_release_date)
+    end_date = date.fromisoformat(end_release_date)
+    if total_pages > TMDB_MAX_PAGES and start_date < end_date:
+        mid_date = start_date + (end_date - start_date) // 2
+        yield from discover_movie_pages(start_release_date, mid_date.isoformat(), max_workers)
+        yield from discover_movie_pages((mid_date + timedelta(days=1)).isoformat(), end_release_date, max_workers)
+        return
+    if total_pages > TMDB_MAX_PAGES:
+        logging.warning(f"{start_release_date} has {total_pages} pages, only the first {TMDB_MAX_PAGES} can be retrieved")
+
+    yield from fetch_tmdb_pages("/discover/movie", params=params, max_workers=max_workers, first_page=first_page, max_pages=TMDB_MAX_PAGES)
+
+def get_tmdb_movie_id(start_release_date, end_release_date) -> pd.Series:
     """
-    Splits a pandas Series into chunks of specified length.
+    Retrieves the ids of all theatrically released movies in a release date window from TMDB.
 
-    Parameters:
-        series (pd.Series): The pandas Series to be split into chunks.
-        length_pieces (int): The length of each chunk. Default is 50.
+    Args:
+        start_release_date (str): Start of the window, in "YYYY-MM-DD" format (inclusive).
+        end_release_date (str): End of the window, in "YYYY-MM-DD" format (inclusive).
 
     Returns:
-        list: A list of pandas Series, where each Series represents a chunk of the original Series.
+        pd.Series: A pandas Series containing the unique TMDB movie IDs as integers.
+    """
+    ids = [movie["id"] for results in discover_movie_pages(start_release_date, end_release_date) for movie in results]
+    print(f"Number of discovered movie IDs: {len(ids)}")
+    return pd.Series(ids, name="id", dtype=int).drop_duplicates().reset_index(drop=True)
+
+def fetch_movie_details(movie_ids, max_workers: int = DEFAULT_MAX_WORKERS, cache: TMDBResponseCache = None, slim: bool = False):
     """
-    indices = []
-    counter = 0
-    while len(indices) < len(series):
-        indices.extend([counter] * length_pieces)
-        counter += 1
+    Retrieves detailed information about movies from the TMDB API, using the shared fetch engine.
 
-    indices = np.array(indices)[:len(series)]
-    return [series.loc[indices == i] for i in np.unique(indices)]
+    Args:
+        movie_ids (iterable): Movie IDs to fetch.
+        max_workers (int): Number of concurrent requests. Default is 16.
+        cache (TMDBResponseCache, optional): Response cache used to send conditional requests, so unchanged
+            movies are served from disk on 304 Not Modified.
+        slim (bool): If True, only keep the fields read downstream (see `slim_movie_record`).
+
+    Yields:
+        dict: The movie data for each id, in completion order.
+    """
+    for _, data_dict in fetch_tmdb_many(movie_ids, "/movie/{id}", params=MOVIE_DETAILS_PARAMS, max_workers=max_workers, cache=cache):
+        yield slim_movie_record(data_dict) if slim else data_dict
 
 def movie_info_chunks(chunk:list):
     """
@@ -83,57 +101,50 @@ def movie_info_chunks(chunk:list):
     Returns:
         list: A list containing the movie data.
     """
-    load_dotenv()
-    AUTHORIZATION = os.getenv("AUTHORIZATION") 
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {AUTHORIZATION}"
-    }
-    logging.info("Start Thread")
-    responses = []
-    for movie_id in chunk:
-        url = f'https://api.themoviedb.org/3/movie/{movie_id}?append_to_response=credits,videos,release_dates,keywords&language=en-US'
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            data_dict = json.loads(response.text)
-            responses.append(data_dict)
-        else:
-            raise Exception("Unable to retrieve TMDB data")
-    return responses
-
-def get_initial_movie_tmdb_details(file_path, start_release_date, end_release_date):
+    return list(fetch_movie_details(chunk))
+
+def get_initial_movie_tmdb_details(file_path, start_release_date, end_release_date, movie_ids: pd.Series = None,
+                                   shard_size: int = DEFAULT_SHARD_SIZE, slim: bool = False):
     """
-    Retrieves movie details for all movie ids from TMDB API and saves the results to a NDJSON file.
+    Retrieves movie details for all movie ids from TMDB API and saves the results to numbered NDJSON shards.
+
+    Shards are written as results arrive and the ids of every completed shard are recorded in a manifest,
+    so a restarted run only fetches the ids that are not on disk yet.
 
     Args:
-        file_path (str): The file path where the NDJSON file will be saved.
+        file_path (str): The directory where the NDJSON shards will be saved.
+        start_release_date (str): Start release date, in "YYYY-MM-DD" format.
+        end_release_date (str): End release date, in "YYYY-MM-DD" format.
+        movie_ids (pd.Series, optional): Movie IDs to fetch (e.g. from historical_data/movie_ids.csv).
+            Discovered from TMDB for the release date window if not given.
+        shard_size (int): Number of movies per shard. Default is 1000.
+        slim (bool): If True, only keep the fields read downstream (see `slim_movie_record`).
 
     Returns:
         None
     """
     reload(logging)
-    movie_ids = get_tmdb_movie_id(start_release_date, end_release_date)
-    chunks_list = chunks(movie_ids)
-    movie_results = []
-
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        results = executor.map(movie_info_chunks, chunks_list)
-
-    for result in results:
-        movie_results = movie_results + result
+    if movie_ids is None:
+        movie_ids = get_tmdb_movie_id(start_release_date, end_release_date)
 
     folder_path = file_path
     if not os.path.exists(folder_path):
         os.makedirs(folder_path)
-        
+
     start_release_date = start_release_date.replace('-', '')
     end_release_date = end_release_date.replace('-', '')
-    filename = f"raw_movie_details_{start_release_date}_{end_release_date}.ndjson"
-    
-    with open(os.path.join(folder_path, filename), "w") as ndjson_file:
-        ndjson_file.write('\n'.join(map(json.dumps, movie_results)))
-    
-    print(os.path.join(folder_path, filename))
+    name = f"raw_movie_details_{start_release_date}_{end_release_date}"
+
+    completed_ids = read_manifest(folder_path, name)
+    remaining_ids = movie_ids[~movie_ids.astype(str).isin(completed_ids)]
+    print(f"Number of movie IDs already on disk: {len(movie_ids) - len(remaining_ids)}, remaining: {len(remaining_ids)}")
+
+    fetched = fetch_tmdb_many(remaining_ids, "/movie/{id}", params=MOVIE_DETAILS_PARAMS)
+    if slim:
+        fetched = ((movie_id, slim_movie_record(data_dict)) for movie_id, data_dict in fetched)
+    count = write_ndjson_shards(folder_path, name, fetched, shard_size=shard_size)
+
+    print(f"{count} movies written to {os.path.join(folder_path, name)}_part*.ndjson")
 
 def upload_raw_initial_movie_tmdb_details_gcs():
     script_dir = os.path.dirname(os.path.realpath(__file__))
@@ -148,186 +159,57 @@ def upload_raw_initial_movie_tmdb_details_gcs():
         historicaldata_dir = os.path.join(os.path.dirname(plugins_dir), "historical_data") 
         str_directory = os.path.join(historicaldata_dir, 'raw_historical_data/tmdb_movie')
         directory = Path(str_directory)
-        filenames = list([file.name for file in directory.glob('*.ndjson')])
+        filenames = list([file.name for file in [*directory.glob('*.ndjson'), *directory.glob('*.ndjson.gz'), *directory.glob('*.parquet')]])
         delete_many_blobs(bucket_name, filenames)
         print(f"{filenames=}")
         upload_many_blobs_with_transfer_manager(bucket_name, filenames=filenames, source_directory=str_directory)
     except Exception as e:
         print(f"Error in uploading TMDB raw data to cloud storage \n Error details: {e}")
 
-def get_raw_tmdb_movie_details_gcs():
+def get_raw_tmdb_movie_details_gcs() -> list:
+    """
+    Retrieves all raw movie details stored in Google Cloud Storage (GCS).
+
+    Returns:
+        list: A list of raw movie detail records (dicts).
+    """
     bucket_name = "movies_tmdb"
-    filenames = list_blobs("movies_tmdb", prefix="raw_movie_details")
-    df =  pd.DataFrame()
+    filenames = raw_blobs(list_blobs("movies_tmdb", prefix="raw_movie_details"))
+    movie_results = []
     for filename in filenames:
-        file_content = read_blob(bucket_name, filename)
-        df = pd.concat([df, file_content], axis=0)
-    return df
+        movie_results.extend(read_blob(bucket_name, filename, json_as_dict=True))
+    return movie_results
 
-def clean_raw_movie_details(save_file_path:str, return_df=False):
+def get_tmdb_languages() -> dict:
     """
-    Cleans the raw movie details from ndjson file and saves the cleaned results to a CSV file.
+    Retrieves the mapping of ISO 639-1 language codes to English language names from TMDB.
+
+    Returns:
+        dict: A dictionary with the ISO 639-1 code as the key and the English name as the value.
+    """
+    lang_dict = tmdb_get("/configuration/languages")
+    return {language['iso_639_1']: language['english_name'] for language in lang_dict}
+
+def clean_movie_records(movie_results: list, save_file_path: str, return_df=False, replace_collection_index=False):
+    """
+    Cleans raw movie detail records and saves the cleaned results to a CSV file.
+
+    The collection IDs of the cleaned movies are added to the collection id index read by the collection extraction.
 
     Args:
-        raw_file_path (str): The file path of the raw collection details NDJSON file.
+        movie_results (list of dicts): Raw movie detail records from the TMDB API.
         save_file_path (str): The directory path where the cleaned CSV file will be saved.
+        replace_collection_index (bool): If True, the collection id index is rebuilt from these movies only.
 
     Returns:
         filepath (str) or dataframe (pd.Dataframe)
     """
-    
-    movie_results = get_raw_tmdb_movie_details_gcs() 
-    
-    selected_columns = ['budget', 'imdb_id', 'original_language', 'release_date',
-                    'revenue', 'runtime', 'status']
-    
-    final_data = {
-    'movie_id': [],
-    'title': [],
-    'original_language': [],
-    'imdb_id': [],
-    'revenue': [],
-    'budget': [],
-    'release_date': [],
-    'runtime': [],
-    'status': [],
-    'production_companies_count': [],
-    'is_adult': [],
-    'is_adaptation': [],
-    'genres': [],
-    'collection_id': [],
-    'cast1_id': [],
-    'cast2_id': [],
-    'director_id': [],
-    'producer_id': [],
-    'video_key_id': [],
-    'tmdb_popularity': [],
-    'tmdb_vote_average': [],
-    'tmdb_vote_count': []
-    }
-    
-    for index, row in movie_results.iterrows():
-
-        is_released_in_cinema = 0
-        is_continue = True
-        try:
-            if not pd.isna(row['release_dates']):
-                for release in row['release_dates']['results']:
-                    if is_continue:
-                        for date in (release["release_dates"]):
-                            if date['type'] == 3:
-                                is_released_in_cinema = 1
-                                is_continue = False
-                                break
-                            else:
-                                continue
-                    else:
-                        break
-        except:
-            continue
-        
-        if is_released_in_cinema == 0:
-            continue #skip movies that were not released in cinemas/theatre
-            
-        final_data['movie_id'].append(int(row['id']))
-        final_data['title'].append(row['title'])
-        final_data['is_adult'].append(0 if row['adult'] == False else 1)
-        final_data['tmdb_popularity'].append(row['popularity'])
-        final_data['tmdb_vote_average'].append(row['vote_average'])
-        final_data['tmdb_vote_count'].append(row['vote_count'])
-        
-        for col in selected_columns:
-            final_data[col].append(row[col])
-        
-        # Collection
-        final_data['collection_id'].append(None if pd.isna(row['belongs_to_collection']) else int(row['belongs_to_collection']['id']))
-        
-        # Production Companies Count
-        final_data['production_companies_count'].append(len((row['production_companies'])))
-        
-        # Genres
-        genre_lst = [i['name']for i in row['genres']]
-        final_data['genres'].append(None if len(genre_lst) == 0 else genre_lst)
-        
-        # Cast
-        num_of_cast = len(row['credits']['cast'])
-        credit_cast = (row['credits']['cast'])
-        if num_of_cast >= 2:
-            final_data['cast1_id'].append(int(credit_cast[0]['id']))
-            final_data['cast2_id'].append(int(credit_cast[1]['id']))
-        elif num_of_cast == 1:
-            final_data['cast1_id'].append(int(credit_cast[0]['id']))                
-            final_data['cast2_id'].append(None)
-        else:                   
-            final_data['cast1_id'].append(None)
-            final_data['cast2_id'].append(None)
-        
-        # Crews
-        director_id = None
-        producer_id = None
-        for job in (row['credits']['crew']):
-            if job['job'] == 'Director':
-                director_id = int(job['id'])
-            elif job['job'] == 'Producer':
-                producer_id = int(job['id'])
-
-        final_data['director_id'].append(director_id)
-        final_data['producer_id'].append(producer_id)
-                
-        # Videos key_id
-        video_key_id = []
-        if len(row['videos']['results']) > 0:
-            for video in (row['videos']['results']):
-                if video['type'] == "Trailer" or  video['type'] == "site" or  video['type'] == "Youtube":
-                        video_key_id.append(video['key'])
-                else:
-                    continue
-            final_data['video_key_id'].append(video_key_id) 
-        else:
-            final_data['video_key_id'].append(None)
-            
-        # Keywords
-        if len(row['keywords']['keywords']) > 0:
-            keyword_lst = [i['name']for i in (row['keywords']['keywords'])]
-            contains_based_on = any('based on' in (item).lower() for item in keyword_lst)
-            final_data['is_adaptation'].append(1 if contains_based_on == True else 0)
-        else:
-            final_data['is_adaptation'].append(0)
-            
-    final_df = pd.DataFrame(final_data)
-    
+    final_df = transform_movie_records(movie_results)
+    update_collection_id_index(final_df['collection_id'], replace=replace_collection_index)
+
     # Change language to its full form
-    lang_url = 'https://api.themoviedb.org/3/configuration/languages'
-       
-    load_dotenv()
-    AUTHORIZATION = os.getenv("AUTHORIZATION") 
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {AUTHORIZATION}"
-    }
+    final_df['original_language'] = final_df['original_language'].map(get_tmdb_languages())
 
-    lang_response = requests.get(lang_url, headers=headers)
-    lang_dict = json.loads(lang_response.text)
-    lang_df = pd.DataFrame.from_dict(lang_dict)
-    final_df = pd.merge(final_df, lang_df[['iso_639_1', 'english_name']], left_on='original_language', right_on='iso_639_1', how='left')
-    
-    # Drop 'original_language', 'iso_639_1'
-    final_df = final_df.drop(columns=['original_language', 'iso_639_1'])
-    # Rename english_name to original_language
-    final_df = final_df.rename(columns={'english_name': 'original_language'})
-    
-    # Remove rows that don't have revenue information
-    final_df = final_df[final_df['revenue'] > 0]
-    
-    # Convert release_date to Date
-    final_df['release_date'] = pd.to_datetime(final_df['release_date']).dt.date
-    
-    # Rearrange columns
-    final_df = final_df[['movie_id', 'revenue', 'budget', 'imdb_id', 'title', 'original_language', 'release_date', 'genres',
-                        'runtime', 'status', 'production_companies_count', 'is_adult', 'is_adaptation',
-                         'collection_id', 'cast1_id', 'cast2_id', 'director_id', 'producer_id', 'tmdb_popularity',
-                         'tmdb_vote_average', 'tmdb_vote_count', 'video_key_id']]
-    
     if not return_df:
         folder_path = save_file_path
         if not os.path.exists(folder_path):
@@ -336,6 +218,19 @@ def clean_raw_movie_details(save_file_path:str, return_df=False):
         return os.path.join(folder_path, "cleaned_movie_info.csv")
     else:
         return final_df
+
+def clean_raw_movie_details(save_file_path:str, return_df=False):
+    """
+    Cleans the raw movie details from ndjson file and saves the cleaned results to a CSV file.
+
+    Args:
+        save_file_path (str): The directory path where the cleaned CSV file will be saved.
+
+    Returns:
+        filepath (str) or dataframe (pd.Dataframe)
+    """
+    movie_results = get_raw_tmdb_movie_details_gcs()
+    return clean_movie_records(movie_results, save_file_path, return_df=return_df, replace_collection_index=True)
     
 def movie_ids_to_update() -> pd.Series:
     """
@@ -357,36 +252,65 @@ def movie_ids_to_update() -> pd.Series:
     
     return past_month_movie_ids_series
 
-def get_movie_tmdb_details(start_release_date, end_release_date):
+def changed_movie_ids_to_update(start_date: date, end_date: date) -> pd.Series:
+    """
+    Retrieves the movie IDs from movie table stored in BigQuery that TMDB reports as changed in the time period,
+    using TMDB's global /movie/changes feed.
+
+    Args:
+        start_date (date): Start date of time interval.
+        end_date (date): End date of time interval.
+
+    Returns:
+        pd.Series: A pandas Series containing the changed TMDB movie IDs as integers.
+    """
+    changed_ids = get_tmdb_changed_ids("movie", start_date, end_date)
+
+    query_movie = '''
+        SELECT DISTINCT CAST(movie_id AS INT64) as movie_id
+        FROM `is3107-418809.movie_dataset.movie`
+    '''
+    movie_ids = load_data_from_table(query_movie)['movie_id']
+    changed_movie_ids = movie_ids[movie_ids.isin(changed_ids)]
+    print(f"Number of changed movie IDs in movie table: {len(changed_movie_ids)}")
+    return pd.Series(changed_movie_ids, name="movie_id").reset_index(drop=True)
+
+def get_movie_tmdb_details(start_release_date, end_release_date, changes_start_date: date = None, changes_end_date: date = None,
+                           slim: bool = False):
     """
     Retrieves movie details for all newly released movie ids from TMDB API and saves the results to a NDJSON file.
-    
-    Get new details for movies that were released in the past one month
-    
+
+    Also gets new details for existing movies. If `changes_end_date` is given, only movies TMDB reports as changed
+    since the last synced watermark (or `changes_start_date` on the first run) are re-fetched. The watermark is not
+    moved here, call `commit_movie_watermark` once the movies have been loaded into BigQuery.
+    Otherwise all movies released in the past one month are re-fetched.
+
     Uploaded movie details into Google Cloud Storage
 
     Args:
-        file_path (str): The file path where the JSON file will be saved.
+        start_release_date (str): Start release date of newly released movies, in "YYYY-MM-DD" format.
+        end_release_date (str): End release date of newly released movies, in "YYYY-MM-DD" format.
+        changes_start_date (date, optional): Start date of the changes window, used when no watermark is recorded.
+        changes_end_date (date, optional): End date of the changes window.
+        slim (bool): If True, only keep the fields read downstream (see `slim_movie_record`).
 
     Returns:
         None
     """
     # Get ids of newly released movies
     new_movie_ids = get_tmdb_movie_id(start_release_date, end_release_date)
-    
-    # Get new details for past month movies
+
+    # Get new details for changed (or past month) movies
     reload(logging)
-    past_month_movie_ids = movie_ids_to_update()
-    movie_ids = pd.concat([new_movie_ids, past_month_movie_ids], axis = 0)
+    if changes_end_date is not None:
+        watermark = read_watermark("movie")
+        if watermark is not None and watermark < changes_end_date:
+            changes_start_date = watermark # re-read the watermark day, changes made later that day may have been missed
+        updated_movie_ids = changed_movie_ids_to_update(changes_start_date, changes_end_date)
+    else:
+        updated_movie_ids = movie_ids_to_update()
+    movie_ids = pd.concat([new_movie_ids, updated_movie_ids], axis = 0)
     movie_ids = movie_ids.drop_duplicates() #Drop duplicates if any
-    chunks_list = chunks(movie_ids)
-    movie_results = []
-
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        results = executor.map(movie_info_chunks, chunks_list)
-
-    for result in results:
-        movie_results = movie_results + result
     
     #to keep a copy to google cloud storage
     script_dir = os.path.dirname(os.path.realpath(__file__))
@@ -405,17 +329,23 @@ def get_movie_tmdb_details(start_release_date, end_release_date):
 
     start_release_date = start_release_date.replace('-', '')
     end_release_date = end_release_date.replace('-', '')
-    filename = f"update_raw_movie_details_{start_release_date}_{end_release_date}.ndjson"
-
-    with open(os.path.join(folder_path, filename), "w") as ndjson_file:
-        ndjson_file.write('\n'.join(map(json.dumps, movie_results)))
+    filename = compressed_name(f"update_raw_movie_details_{start_release_date}_{end_release_date}.ndjson")
+
+    # Movies re-fetched every week are mostly unchanged, revalidate them against the on-disk cache
+    cache = TMDBResponseCache(DEFAULT_CACHE_PATH)
+    try:
+        with open_raw_file(os.path.join(folder_path, filename)) as ndjson_file:
+            write_ndjson(ndjson_file, fetch_movie_details(movie_ids, cache=cache, slim=slim))
+    finally:
+        cache.close()
+    write_parquet_copy(os.path.join(folder_path, filename))
     
     print(os.path.join(folder_path, filename))
      
     try:   
         bucket_name = "update_movies_tmdb"
         directory = Path(str_directory)
-        filenames = list([file.name for file in directory.glob('*.ndjson')])
+        filenames = list([file.name for file in [*directory.glob('*.ndjson'), *directory.glob('*.ndjson.gz'), *directory.glob('*.parquet')]])
         delete_many_blobs(bucket_name, filenames)
         print(f"{filenames=}")
         for filename in filenames:
@@ -425,165 +355,37 @@ def get_movie_tmdb_details(start_release_date, end_release_date):
     except Exception as e:
         print(f"Error in uploading TMDB raw data to cloud storage \n Error details: {e}")
 
-def clean_new_raw_movie_details(save_file_path:str, return_df=False):
-    # Get new and updated movies
-    bucket_name = "update_movies_tmdb"
-    filenames = list_blobs("update_movies_tmdb", prefix="update_raw_movie_details_")
-    filenames.sort(key=lambda x: x.split('_')[-1].split('.')[0])
-    movie_results = read_blob(bucket_name, filenames[-1])
-    selected_columns = ['budget', 'imdb_id', 'original_language', 'release_date',
-                'revenue', 'runtime', 'status']
-
-    final_data = {
-    'movie_id': [],
-    'title': [],
-    'original_language': [],
-    'imdb_id': [],
-    'revenue': [],
-    'budget': [],
-    'release_date': [],
-    'runtime': [],
-    'status': [],
-    'production_companies_count': [],
-    'is_adult': [],
-    'is_adaptation': [],
-    'genres': [],
-    'collection_id': [],
-    'cast1_id': [],
-    'cast2_id': [],
-    'director_id': [],
-    'producer_id': [],
-    'video_key_id': [],
-    'tmdb_popularity': [],
-    'tmdb_vote_average': [],
-    'tmdb_vote_count': []
-    }
-
-    for index, row in movie_results.iterrows():
-
-        is_released_in_cinema = 0
-        is_continue = True
-        try:
-            if not pd.isna(row['release_dates']):
-                for release in row['release_dates']['results']:
-                    if is_continue:
-                        for date in (release["release_dates"]):
-                            if date['type'] == 3:
-                                is_released_in_cinema = 1
-                                is_continue = False
-                                break
-                            else:
-                                continue
-                    else:
-                        break
-        except:
-            continue
-
-        if is_released_in_cinema == 0:
-            continue #skip movies that were not released in cinemas/theatre
-
-        final_data['movie_id'].append(int(row['id']))
-        final_data['title'].append(row['title'])
-        final_data['is_adult'].append(0 if row['adult'] == False else 1)
-        final_data['tmdb_popularity'].append(row['popularity'])
-        final_data['tmdb_vote_average'].append(row['vote_average'])
-        final_data['tmdb_vote_count'].append(row['vote_count'])
-
-        for col in selected_columns:
-            final_data[col].append(row[col])
-
-        # Collection
-        final_data['collection_id'].append(None if pd.isna(row['belongs_to_collection']) else int(row['belongs_to_collection']['id']))
-
-        # Production Companies Count
-        final_data['production_companies_count'].append(len((row['production_companies'])))
-
-        # Genres
-        genre_lst = [i['name']for i in row['genres']]
-        final_data['genres'].append(None if len(genre_lst) == 0 else genre_lst)
-
-        # Cast
-        num_of_cast = len(row['credits']['cast'])
-        credit_cast = (row['credits']['cast'])
-        if num_of_cast >= 2:
-            final_data['cast1_id'].append(int(credit_cast[0]['id']))
-            final_data['cast2_id'].append(int(credit_cast[1]['id']))
-        elif num_of_cast == 1:
-            final_data['cast1_id'].append(int(credit_cast[0]['id']))                
-            final_data['cast2_id'].append(None)
-        else:                   
-            final_data['cast1_id'].append(None)
-            final_data['cast2_id'].append(None)
-
-        # Crews
-        director_id = None
-        producer_id = None
-        for job in (row['credits']['crew']):
-            if job['job'] == 'Director':
-                director_id = int(job['id'])
-            elif job['job'] == 'Producer':
-                producer_id = int(job['id'])
-
-        final_data['director_id'].append(director_id)
-        final_data['producer_id'].append(producer_id)
-
-        # Videos key_id
-        video_key_id = []
-        if len(row['videos']['results']) > 0:
-            for video in (row['videos']['results']):
-                if video['type'] == "Trailer" or  video['type'] == "site" or  video['type'] == "Youtube":
-                        video_key_id.append(video['key'])
-                else:
-                    continue
-            final_data['video_key_id'].append(video_key_id) 
-        else:
-            final_data['video_key_id'].append(None)
-
-        # Keywords
-        if len(row['keywords']['keywords']) > 0:
-            keyword_lst = [i['name']for i in (row['keywords']['keywords'])]
-            contains_based_on = any('based on' in (item).lower() for item in keyword_lst)
-            final_data['is_adaptation'].append(1 if contains_based_on == True else 0)
-        else:
-            final_data['is_adaptation'].append(0)
-
-    final_df = pd.DataFrame(final_data)
+def commit_movie_watermark(changes_end_date: date):
+    """
+    Moves the movie changes watermark to `changes_end_date`, unless it is already past it (e.g. on catch-up runs).
 
-    # Change language to its full form
-    lang_url = 'https://api.themoviedb.org/3/configuration/languages'
-    load_dotenv()
-    AUTHORIZATION = os.getenv("AUTHORIZATION") 
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {AUTHORIZATION}"
-    }
+    Only call it once the movies re-fetched by `get_movie_tmdb_details` have been loaded into BigQuery,
+    so a failed load is retried from the same changes window on the next run.
 
-    lang_response = requests.get(lang_url, headers=headers)
-    lang_dict = json.loads(lang_response.text)
-    lang_df = pd.DataFrame.from_dict(lang_dict)
-    final_df = pd.merge(final_df, lang_df[['iso_639_1', 'english_name']], left_on='original_language', right_on='iso_639_1', how='left')
+    Args:
+        changes_end_date (date): End date of the changes window that has been loaded.
 
-    # Drop 'original_language', 'iso_639_1'
-    final_df = final_df.drop(columns=['original_language', 'iso_639_1'])
-    # Rename english_name to original_language
-    final_df = final_df.rename(columns={'english_name': 'original_language'})
+    Returns:
+        None
+    """
+    watermark = read_watermark("movie")
+    if watermark is None or watermark < changes_end_date:
+        write_watermark("movie", changes_end_date)
+        print(f"Movie changes watermark moved to {changes_end_date}")
 
-    # Remove rows that don't have revenue information
-    final_df = final_df[final_df['revenue'] > 0]
+def clean_new_raw_movie_details(save_file_path:str, return_df=False):
+    """
+    Cleans the latest new and updated raw movie details from ndjson file and saves the cleaned results to a CSV file.
 
-    # Convert release_date to Date
-    final_df['release_date'] = pd.to_datetime(final_df['release_date']).dt.date
+    Args:
+        save_file_path (str): The directory path where the cleaned CSV file will be saved.
 
-    # Rearrange columns
-    final_df = final_df[['movie_id', 'revenue', 'budget', 'imdb_id', 'title', 'original_language', 'release_date', 'genres',
-                        'runtime', 'status', 'production_companies_count', 'is_adult', 'is_adaptation',
-                         'collection_id', 'cast1_id', 'cast2_id', 'director_id', 'producer_id', 'tmdb_popularity',
-                         'tmdb_vote_average', 'tmdb_vote_count', 'video_key_id']]
-    if not return_df:
-        folder_path = save_file_path
-        if not os.path.exists(folder_path):
-            os.makedirs(folder_path)
-        final_df.to_csv(os.path.join(folder_path, "cleaned_movie_info.csv"), index=False)
-        return os.path.join(folder_path, "cleaned_movie_info.csv")
-    else:
-        return final_df
\ No newline at end of file
+    Returns:
+        filepath (str) or dataframe (pd.Dataframe)
+    """
+    # Get new and updated movies
+    bucket_name = "update_movies_tmdb"
+    filenames = raw_blobs(list_blobs("update_movies_tmdb", prefix="update_raw_movie_details_"))
+    filenames.sort(key=lambda x: x.split('_')[-1].split('.')[0])
+    movie_results = read_blob(bucket_name, filenames[-1], json_as_dict=True)
+    return clean_movie_records(movie_results, save_file_path, return_df=return_df)
@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+
+THEATRICAL_RELEASE_TYPE = 3
+TRAILER_VIDEO_TYPES = ("Trailer", "site", "Youtube")
+MOVIE_COLUMNS = ['movie_id', 'revenue', 'budget', 'imdb_id', 'title', 'original_language', 'release_date', 'genres',
+                 'runtime', 'status', 'production_companies_count', 'is_adult', 'is_adaptation',
+                 'collection_id', 'cast1_id', 'cast2_id', 'director_id', 'producer_id', 'tmdb_popularity',
+                 'tmdb_vote_average', 'tmdb_vote_count', 'video_key_id']
+SLIM_MOVIE_FIELDS = ['id', 'title', 'adult', 'budget', 'imdb_id', 'original_language', 'release_date', 'revenue',
+                     'runtime', 'status', 'popularity', 'vote_average', 'vote_count']
+SLIM_CREW_JOBS = ("Director", "Producer")
+SLIM_VIDEO_FIELDS = ['key', 'site', 'type', 'published_at']
+
+
+def slim_movie_record(record: dict) -> dict:
+    """
+    Projects a raw TMDB movie details record onto the fields read downstream (cleaning, collection ids,
+    video keys and title lookup), keeping the raw nested layout so every reader works on either format.
+
+    Kept: scalar fields in `SLIM_MOVIE_FIELDS`, collection id and name, genre names, production company ids,
+    the top 2 cast, Director/Producer crew, video key/site/type/published_at, theatrical release dates
+    and keyword names.
+
+    Args:
+        record (dict): Raw TMDB movie details, with credits, videos, release_dates and keywords appended.
+
+    Returns:
+        dict: The slim record.
+    """
+    slim = {field: record.get(field) for field in SLIM_MOVIE_FIELDS}
+    collection = record.get("belongs_to_collection")
+    slim["belongs_to_collection"] = {"id": collection.get("id"), "name": collection.get("name")} if isinstance(collection, dict) else None
+    slim["genres"] = [{"name": genre.get("name")} for genre in record.get("genres") or []]
+    slim["production_companies"] = [{"id": company.get("id")} for company in record.get("production_companies") or []]
+    slim["credits"] = {
+        "cast": [{"id": cast.get("id")} for cast in _nested(record, "credits", "cast")[:2]],
+        "crew": [{"id": crew.get("id"), "job": crew.get("job")} for crew in _nested(record, "credits", "crew") if crew.get("job") in SLIM_CREW_JOBS]
+    }
+    slim["videos"] = {"results": [{field: video.get(field) for field in SLIM_VIDEO_FIELDS} for video in _nested(record, "videos", "results")]}
+    if isinstance(record.get("release_dates"), dict):
+        theatrical = [{"iso_3166_1": country.get("iso_3166_1"),
+                       "release_dates": [{"type": release.get("type"), "release_date": release.get("release_date")}
+                                         for release in country.get("release_dates") or [] if release.get("type") == THEATRICAL_RELEASE_TYPE]}
+                      for country in _nested(record, "release_dates", "results")]
+        slim["release_dates"] = {"results": [country for country in theatrical if country["release_dates"]]}
+    else:
+        slim["release_dates"] = None
+    slim["keywords"] = {"keywords": [{"name": keyword.get("name")} for keyword in _nested(record, "keywords", "keywords")]}
+    return slim
+
+
+def _explode(nested_lists: list):
+    """
+    Flattens a list of lists into one flat list and the position of the list each item came from.
+
+    Args:
+        nested_lists (list): One list of items per record.
+
+    Returns:
+        tuple(np.ndarray, list): Record position of every item, and the flat list of items.
+    """
+    lengths = np.fromiter((len(items) for items in nested_lists), dtype=np.int64, count=len(nested_lists))
+    owners = np.repeat(np.arange(len(nested_lists)), lengths)
+    items = [item for items in nested_lists for item in items]
+    return owners, items
+
+
+def _nested(record: dict, *keys) -> list:
+    """Returns the list found under `keys` in a record, or an empty list if any level is missing."""
+    value = record
+    for key in keys:
+        if not isinstance(value, dict):
+            return []
+        value = value.get(key)
+    return value if isinstance(value, list) else []
+
+
+def is_theatrical_release(records: list) -> np.ndarray:
+    """
+    Flags records that have at least one theatrical release date, in any country.
+
+    Args:
+        records (list of dicts): Raw TMDB movie details, with `release_dates` appended.
+
+    Returns:
+        np.ndarray: Boolean array, one flag per record.
+    """
+    countries = [_nested(record, "release_dates", "results") for record in records]
+    country_owners, country_releases = _explode(countries)
+    release_owners, releases = _explode([release.get("release_dates") or [] for release in country_releases])
+    release_types = np.array([release.get("type") for release in releases], dtype=object)
+    theatrical_owners = country_owners[release_owners[release_types == THEATRICAL_RELEASE_TYPE]]
+    return np.bincount(theatrical_owners, minlength=len(records)) > 0
+
+
+def _last_crew_id(crew_owners: np.ndarray, crew_jobs: np.ndarray, crew_ids: np.ndarray, job: str, n: int) -> np.ndarray:
+    """Returns, per record, the id of the last crew member with `job` (NaN if none)."""
+    mask = crew_jobs == job
+    return (pd.Series(crew_ids[mask], index=crew_owners[mask], dtype=float)
+            .groupby(level=0).last()
+            .reindex(range(n))
+            .to_numpy())
+
+
+def transform_movie_records(records: list) -> pd.DataFrame:
+    """
+    Cleans raw TMDB movie details into the columns of the movie table in one columnar pass.
+
+    Movies that were never released in cinemas/theatres and movies without revenue information are dropped.
+    `original_language` is left as the ISO 639-1 code.
+
+    Args:
+        records (list of dicts): Raw TMDB movie details, with credits, videos, release_dates and keywords appended.
+
+    Returns:
+        pd.DataFrame: The cleaned movie details, with columns in `MOVIE_COLUMNS` order.
+    """
+    records = [record for record, keep in zip(records, is_theatrical_release(records)) if keep]
+    n = len(records)
+
+    # Cast: top 2 billed
+    top_cast = [_nested(record, "credits", "cast")[:2] for record in records]
+    cast1_id = [cast[0]["id"] if len(cast) > 0 else None for cast in top_cast]
+    cast2_id = [cast[1]["id"] if len(cast) > 1 else None for cast in top_cast]
+
+    # Crews: last listed Director / Producer
+    crew_owners, crew = _explode([_nested(record, "credits", "crew") for record in records])
+    crew_jobs = np.array([member.get("job") for member in crew], dtype=object)
+    crew_ids = np.array([member.get("id") for member in crew], dtype=float)
+    director_id = _last_crew_id(crew_owners, crew_jobs, crew_ids, "Director", n)
+    producer_id = _last_crew_id(crew_owners, crew_jobs, crew_ids, "Producer", n)
+
+    # Keywords: adaptation if any keyword mentions "based on"
+    keyword_owners, keywords = _explode([_nested(record, "keywords", "keywords") for record in records])
+    based_on = pd.Series([keyword.get("name") or "" for keyword in keywords], dtype=object).str.lower().str.contains("based on", regex=False)
+    is_adaptation = (np.bincount(keyword_owners[based_on.to_numpy(dtype=bool)], minlength=n) > 0).astype(int)
+
+    # Videos: trailer keys, None if the movie has no videos at all
+    videos = [_nested(record, "videos", "results") for record in records]
+    video_key_id = [[video["key"] for video in results if video.get("type") in TRAILER_VIDEO_TYPES] if results else None
+                    for results in videos]
+
+    genres = [[genre["name"] for genre in record.get("genres") or []] or None for record in records]
+    collections = [record.get("belongs_to_collection") for record in records]
+
+    final_df = pd.DataFrame({
+        'movie_id': np.array([record["id"] for record in records], dtype=np.int64),
+        'revenue': [record.get("revenue") for record in records],
+        'budget': [record.get("budget") for record in records],
+        'imdb_id': [record.get("imdb_id") for record in records],
+        'title': [record.get("title") for record in records],
+        'original_language': [record.get("original_language") for record in records],
+        'release_date': [record.get("release_date") for record in records],
+        'genres': genres,
+        'runtime': [record.get("runtime") for record in records],
+        'status': [record.get("status") for record in records],
+        'production_companies_count': [len(record.get("production_companies") or []) for record in records],
+        'is_adult': [int(bool(record.get("adult"))) for record in records],
+        'is_adaptation': is_adaptation,
+        'collection_id': np.array([collection["id"] if isinstance(collection, dict) else None for collection in collections], dtype=float),
+        'cast1_id': np.array(cast1_id, dtype=float),
+        'cast2_id': np.array(cast2_id, dtype=float),
+        'director_id': director_id,
+        'producer_id': producer_id,
+        'tmdb_popularity': [record.get("popularity") for record in records],
+        'tmdb_vote_average': [record.get("vote_average") for record in records],
+        'tmdb_vote_count': [record.get("vote_count") for record in records],
+        'video_key_id': video_key_id,
+    }, columns=MOVIE_COLUMNS)
+
+    # Remove rows that don't have revenue information
+    final_df = final_df[final_df['revenue'] > 0].reset_index(drop=True)
+
+    # Convert release_date to Date
+    final_df['release_date'] = pd.to_datetime(final_df['release_date']).dt.date
+
+    return final_df
@@ -1,19 +1,32 @@
 import sys
 from pathlib import Path
 import pandas as pd
-import numpy as np
 import os
 from googlecloud.read_data_gcs import read_blob, list_blobs
 from googlecloud.upload_initial_data_gcs import delete_many_blobs, upload_many_blobs_with_transfer_manager, upload_blob
 from googlecloud.read_data_bigquery import load_data_from_table
-from dotenv import load_dotenv
+from google.cloud import bigquery
+from googlecloud.compression import compressed_name, open_raw_file
+from googlecloud.columnar import write_parquet_copy, raw_blobs
+from extraction.tmdb_people.transform import transform_people_records
+from extraction.tmdb_people.store import PeopleDetailStore, DEFAULT_PEOPLE_MAX_AGE
+from extraction.tmdb_api.fetch import fetch_tmdb_many, get_tmdb_changed_ids, write_ndjson, DEFAULT_MAX_WORKERS
 import logging
-import requests
 from importlib import reload
-import concurrent.futures
-import json
 from datetime import date
-from datetime import datetime
+from datetime import datetime, timedelta
+
+# Unpivots the four people columns of the movie table in a single scan
+MOVIE_PEOPLE_QUERY = '''
+    WITH movie_people AS (
+        SELECT DISTINCT people_id
+        FROM (
+            SELECT CAST(cast1_id AS INT64) AS cast1_id, CAST(cast2_id AS INT64) AS cast2_id,
+                CAST(director_id AS INT64) AS director_id, CAST(producer_id AS INT64) AS producer_id
+            FROM `is3107-418809.movie_dataset.movie`
+        )
+        UNPIVOT (people_id FOR role IN (cast1_id, cast2_id, director_id, producer_id))
+    )'''
 
 def get_initial_tmdb_people_id_bq() -> pd.Series: 
     """
@@ -23,195 +36,123 @@ def get_initial_tmdb_people_id_bq() -> pd.Series:
         pd.Series: A pandas Series containing the unique TMDB people IDs as integers.
     """
     
-    query_people = '''
-    SELECT DISTINCT CAST(cast1_id AS INT64) AS people_id FROM `is3107-418809.movie_dataset.movie`
-    WHERE cast1_id IS NOT NULL
-    UNION DISTINCT
-    SELECT DISTINCT CAST(cast2_id AS INT64) AS people_id FROM `is3107-418809.movie_dataset.movie`
-    WHERE cast2_id IS NOT NULL
-    UNION DISTINCT
-    SELECT DISTINCT CAST(director_id AS INT64) AS people_id FROM `is3107-418809.movie_dataset.movie`
-    WHERE director_id IS NOT NULL
-    UNION DISTINCT
-    SELECT DISTINCT CAST(producer_id AS INT64) AS people_id FROM `is3107-418809.movie_dataset.movie`
-    WHERE producer_id IS NOT NULL
+    query_people = f'''
+    {MOVIE_PEOPLE_QUERY}
+    SELECT people_id FROM movie_people
     '''
     
     new_people = load_data_from_table(query_people)
     
     return pd.Series(new_people['people_id'])
 
-def chunks(series: pd.Series, length_pieces: int = 50):
+def fetch_people_details(people_ids, max_workers: int = DEFAULT_MAX_WORKERS, store: PeopleDetailStore = None,
+                         max_age: timedelta = DEFAULT_PEOPLE_MAX_AGE):
     """
-    Splits a pandas Series into chunks of specified length.
-
-    Parameters:
-        series (pd.Series): The pandas Series to be split into chunks.
-        length_pieces (int): The length of each chunk. Default is 50.
+    Retrieves detailed information about people from the TMDB API, using the shared fetch engine.
 
-    Returns:
-        list: A list of pandas Series, where each Series represents a chunk of the original Series.
-    """
-    indices = []
-    counter = 0
-    while len(indices) < len(series):
-        indices.extend([counter] * length_pieces)
-        counter += 1
+    If a store is given, people fetched within `max_age` are read from it instead of the API, and every newly
+    fetched person is saved to it. Stored records are the full API records, so both kinds can be written to the same raw file.
 
-    indices = np.array(indices)[:len(series)]
-    return [series.loc[indices == i] for i in np.unique(indices)]
+    Args:
+        people_ids (iterable): People IDs to fetch.
+        max_workers (int): Number of concurrent requests. Default is 16.
+        store (PeopleDetailStore, optional): Persistent store of previously fetched people details.
+        max_age (timedelta): Freshness window of stored people details. Default is 7 days.
 
-def people_info_chunks(chunk:list):
+    Yields:
+        dict: The people data for each id, stored people first, then fetched people in completion order.
+    """
+    if store is not None:
+        people_ids = [int(people_id) for people_id in people_ids]
+        stored = store.get_fresh(people_ids, max_age=max_age)
+        print(f"Number of people details reused from store: {len(stored)}")
+        yield from stored.values()
+        people_ids = [people_id for people_id in people_ids if people_id not in stored]
+
+    params = {"append_to_response": "movie_credits", "language": "en-US"}
+    for people_id, data_dict in fetch_tmdb_many(people_ids, "/person/{id}", params=params, max_workers=max_workers):
+        if store is not None:
+            store.put(people_id, data_dict)
+        yield data_dict
+
+def people_info_chunks(chunk:list, store: PeopleDetailStore = None, max_age: timedelta = DEFAULT_PEOPLE_MAX_AGE):
     """
     Retrieves detailed information about people from the TMDB API for one chunk of people ids.
 
+    People fetched within `max_age` are read from the people detail store instead of the API.
+
     Args:
         chunks (list): A list of series of people IDs.
+        store (PeopleDetailStore, optional): Persistent store of people details. Default is the store in
+            historical_data/cache.
+        max_age (timedelta): Freshness window of stored people details. Default is 7 days.
 
     Returns:
         list: A list containing the people data.
     """
-    load_dotenv()
-    AUTHORIZATION = os.getenv("AUTHORIZATION") 
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {AUTHORIZATION}"
-    }
-    logging.info("Start Thread")
-    
-    responses = []
-    for people_id in chunk:
-        url = f"https://api.themoviedb.org/3/person/{people_id}?append_to_response=movie_credits&language=en-US"
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            data_dict = json.loads(response.text)
-            responses.append(data_dict)
-        else:
-            raise Exception("Unable to retrieve TMDB data")
-    return responses
+    if store is not None:
+        return list(fetch_people_details(chunk, store=store, max_age=max_age))
+    store = PeopleDetailStore()
+    try:
+        return list(fetch_people_details(chunk, store=store, max_age=max_age))
+    finally:
+        store.close()
     
-def get_initial_people_tmdb_details(file_path):
+def get_initial_people_tmdb_details(file_path, max_age: timedelta = DEFAULT_PEOPLE_MAX_AGE):
     """
     Retrieves people details for all people ids from TMDB API and saves the results to a NDJSON file.
 
     Args:
         file_path (str): The file path where the NDJSON file will be saved.
+        max_age (timedelta): People fetched within this window are reused from the people detail store.
+            Default is 7 days.
 
     Returns:
         None
     """
     reload(logging)
     people_ids = get_initial_tmdb_people_id_bq()
-    chunks_list = chunks(people_ids)
-    people_results = []
-
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        results = executor.map(people_info_chunks, chunks_list)
-
-    for result in results:
-        people_results = people_results + result
 
     folder_path = file_path
     if not os.path.exists(folder_path):
         os.makedirs(folder_path)
         
     date_now = date.today().strftime('%Y%m%d')
-    filename = f"raw_people_{date_now}.ndjson"
+    filename = compressed_name(f"raw_people_{date_now}.ndjson")
 
-    with open(os.path.join(folder_path, filename), "w") as ndjson_file:
-        ndjson_file.write('\n'.join(map(json.dumps, people_results)))
+    store = PeopleDetailStore()
+    try:
+        with open_raw_file(os.path.join(folder_path, filename)) as ndjson_file:
+            write_ndjson(ndjson_file, fetch_people_details(people_ids, store=store, max_age=max_age))
+    finally:
+        store.close()
+    write_parquet_copy(os.path.join(folder_path, filename))
     
     print(os.path.join(folder_path, filename))
 
 def get_raw_tmdb_people_details_gcs():
+    """
+    Retrieves the raw people details stored in Google Cloud Storage (GCS), one file at a time.
+
+    Yields:
+        list: The raw people detail records (dicts) of one file.
+    """
     bucket_name = "movies_tmdb"
-    filenames = list_blobs("movies_tmdb", prefix="raw_people")
-    df =  pd.DataFrame()
+    filenames = raw_blobs(list_blobs("movies_tmdb", prefix="raw_people"))
     for filename in filenames:
-        file_content = read_blob(bucket_name, filename)
-        df = pd.concat([df, file_content], axis=0)
-    return df
+        yield read_blob(bucket_name, filename, json_as_dict=True)
 
-def clean_raw_people_details(save_file_path:str, return_df=False):
+def save_people_info(people_info: pd.DataFrame, save_file_path: str, return_df=False):
     """
-    Cleans the raw people details from ndjson file and saves the cleaned results to a CSV file.
+    Saves cleaned people details to a CSV file, or returns them.
 
     Args:
-        raw_file_path (str): The file path of the raw collection details NDJSON file.
+        people_info (pd.DataFrame): The cleaned people details.
         save_file_path (str): The directory path where the cleaned CSV file will be saved.
 
     Returns:
         filepath (str) or dataframe (pd.Dataframe)
     """
-    
-    people_results = get_raw_tmdb_people_details_gcs() 
-    
-    people_info = pd.DataFrame()
-    
-    name_lst = []
-    bir_lst = []
-    gender_lst = []
-    pop = []
-    cast_credits = []
-    crew_credits = []
-    known = []
-    people_id = []
-    
-    for index, row in people_results.iterrows():
-        # Make the request
-        id_ = (int(row['id']))
-        people_id.append(id_)
-
-        try:
-            name = row['name']
-        except KeyError:
-            name = None
-        name_lst.append(name)
-        try:
-            birthday = row['birthday']
-        except KeyError:
-            birthday = None
-        bir_lst.append(birthday)
-        try:
-            gender = row['gender']
-        except KeyError:
-            gender = None
-        gender_lst.append(gender)
-        try:
-            tmdb_popularity = row['popularity']
-        except KeyError:
-            tmdb_popularity = None
-        pop.append(tmdb_popularity)
-        try:
-            known_for = row['known_for_department']
-        except KeyError:
-            known_for = None
-        known.append(known_for)
-        
-        # Number of credits
-        try:
-            cast_num = len(row['movie_credits']["cast"])
-        except KeyError:
-            cast_num = 0
-        cast_credits.append(cast_num)
-        try:
-            crew_num = len(row['movie_credits']["crew"])
-        except KeyError:
-            crew_num = 0
-        crew_credits.append(crew_num)
-
-    people_info['people_id'] = people_id
-    people_info['name'] = name_lst
-    people_info['birthday'] = bir_lst
-    people_info['gender'] = gender_lst
-    people_info['tmdb_popularity'] = pop
-    people_info['known_for'] = known
-    people_info['total_number_cast_credits'] = cast_credits
-    people_info['total_number_crew_credits'] = crew_credits
-    
-    # Convert birthday to Date
-    people_info['birthday'] = pd.to_datetime(people_info['birthday']).dt.date
-    
     if not return_df:
         folder_path = save_file_path
         if not os.path.exists(folder_path):
@@ -220,7 +161,45 @@ def clean_raw_people_details(save_file_path:str, return_df=False):
         return os.path.join(folder_path, "cleaned_people_info.csv")
     else:
         return people_info
+
+def clean_raw_people_details(save_file_path:str, return_df=False):
+    """
+    Cleans the raw people details from ndjson file and saves the cleaned results to a CSV file.
+
+    Each raw file is cleaned as soon as it is read, so only one file of raw records is held in memory.
+
+    Args:
+        save_file_path (str): The directory path where the cleaned CSV file will be saved.
+
+    Returns:
+        filepath (str) or dataframe (pd.Dataframe)
+    """
+    people_info = pd.concat([transform_people_records(people_results) for people_results in get_raw_tmdb_people_details_gcs()],
+                            ignore_index=True)
+    return save_people_info(people_info, save_file_path, return_df=return_df)
     
+def fetch_people_changes(people_ids, start_date: datetime, end_date: datetime, max_workers: int = DEFAULT_MAX_WORKERS):
+    """
+    Retrieves updated information about people from the TMDB API for the time period, using the shared fetch engine.
+
+    Args:
+        people_ids (iterable): People IDs to fetch changes for.
+        start_date (datetime): Start date of time interval.
+        end_date (datetime): End date of time interval.
+        max_workers (int): Number of concurrent requests. Default is 16.
+
+    Yields:
+        dict: The people id and its latest changed values, in completion order.
+    """
+    params = {"start_date": start_date.strftime("%Y-%m-%d"), "end_date": end_date.strftime("%Y-%m-%d")}
+    for people_id, data_dict in fetch_tmdb_many(people_ids, "/person/{id}/changes", params=params, max_workers=max_workers):
+        try:
+            yield {"people_id": people_id, "changes": [{"key": field["key"], "value": field["items"][-1]["value"]} for field in data_dict["changes"] if field["items"][-1]["action"] not in ["deleted", "created", "destroyed"]]}
+        except KeyError as e:
+            print(data_dict)
+            print("Error details:", e)
+            continue
+
 def people_update_chunks(chunk: list, start_date: datetime, end_date: datetime):
     """
     Retrieves updated information about people from the TMDB API for one chunk of people ids for the time period.
@@ -233,95 +212,84 @@ def people_update_chunks(chunk: list, start_date: datetime, end_date: datetime):
     Returns:
         list: A list containing the people data.
     """
-    load_dotenv()
-    AUTHORIZATION = os.getenv("AUTHORIZATION") 
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {AUTHORIZATION}"
-    }
-    logging.info("Start Thread")
-
-    responses = []
-    for people_id in chunk:
-        url = f'https://api.themoviedb.org/3/person/{people_id}/changes?start_date={start_date.strftime("%Y-%m-%d")}&end_date={end_date.strftime("%Y-%m-%d")}'
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            try:
-                data_dict = json.loads(response.text)
-                response_dict = {"people_id": people_id, "changes": [{"key": field["key"], "value": field["items"][-1]["value"]} for field in data_dict["changes"] if field["items"][-1]["action"] not in ["deleted", "created", "destroyed"]]}
-                responses.append(response_dict)
-            except KeyError as e:
-                print(json.loads(response.text))
-                print("Error details:", e)
-                continue
-        else:
-            raise Exception("Unable to retrieve TMDB data")
-    return responses
-
-def new_updated_tmdb_people_id() -> pd.Series:
+    return list(fetch_people_changes(chunk, start_date, end_date))
+
+def new_updated_tmdb_people_id():
     """
-    Retrieves the people IDs from people table and compare it with latest people IDs from movie table stored in BigQuery.
+    Retrieves the people IDs from the movie table that are not yet in the people table, in one BigQuery scan
+    of each table.
 
     Returns:
-        tuple(pd.Series, pd.Series): A pandas Series containing the unique new TMDB people IDs as integers and a 
-        pandas Series containing the old TMDB people IDs as integers.
+        tuple(pd.Series, int): A pandas Series containing the unique new TMDB people IDs as integers, and the number
+        of people IDs from the movie table already in the people table.
     """
-    query_people = '''
-    SELECT DISTINCT CAST(people_id as INT64) AS people_id FROM `is3107-418809.movie_dataset.people`
+    query_people = f'''
+    {MOVIE_PEOPLE_QUERY},
+    frontier AS (
+        SELECT movie_people.people_id, people.people_id IS NULL AS is_new
+        FROM movie_people
+        LEFT JOIN (SELECT DISTINCT CAST(people_id AS INT64) AS people_id FROM `is3107-418809.movie_dataset.people`) AS people
+        USING (people_id)
+    )
+    SELECT
+        ARRAY_AGG(IF(is_new, people_id, NULL) IGNORE NULLS) AS new_people_ids,
+        COUNTIF(NOT is_new) AS existing_people_count
+    FROM frontier
     '''
     
-    old_people = load_data_from_table(query_people)
-    old_people_set = set(old_people['people_id'])
-    
-    # Replace with actual dataset later
-    query_new_people = '''
-    SELECT DISTINCT CAST(cast1_id AS INT64) AS people_id FROM `is3107-418809.movie_dataset.movie`
-    WHERE cast1_id IS NOT NULL
-    UNION DISTINCT
-    SELECT DISTINCT CAST(cast2_id AS INT64) AS people_id FROM `is3107-418809.movie_dataset.movie`
-    WHERE cast2_id IS NOT NULL
-    UNION DISTINCT
-    SELECT DISTINCT CAST(director_id AS INT64) AS people_id FROM `is3107-418809.movie_dataset.movie`
-    WHERE director_id IS NOT NULL
-    UNION DISTINCT
-    SELECT DISTINCT CAST(producer_id AS INT64) AS people_id FROM `is3107-418809.movie_dataset.movie`
-    WHERE producer_id IS NOT NULL
-    '''
-    
-    new_people = load_data_from_table(query_new_people)
-    new_people_set = set(new_people['people_id'])
-    
-    difference = new_people_set.difference(old_people_set)
+    frontier = load_data_from_table(query_people).iloc[0]
+    new_people_ids = frontier['new_people_ids'] if frontier['new_people_ids'] is not None else []
+
+    return pd.Series(list(new_people_ids), dtype="int64"), int(frontier['existing_people_count'])
 
-    return pd.Series(list(difference)), pd.Series(list(old_people_set))
+def changed_people_ids_to_update(start_date: datetime, end_date: datetime) -> pd.Series:
+    """
+    Retrieves the people IDs from people table stored in BigQuery that TMDB reports as changed in the time period,
+    using TMDB's global /person/changes feed, so that only those need a per-person /changes call.
+
+    Args:
+        start_date (datetime): Start date of time interval.
+        end_date (datetime): End date of time interval.
+
+    Returns:
+        pd.Series: A pandas Series containing the changed TMDB people IDs as integers.
+    """
+    changed_ids = get_tmdb_changed_ids("person", start_date, end_date)
+
+    query_people = '''
+    SELECT DISTINCT CAST(people_id AS INT64) AS people_id FROM `is3107-418809.movie_dataset.people`
+    WHERE CAST(people_id AS INT64) IN UNNEST(@changed_ids)
+    '''
+    changed_people = load_data_from_table(query_people, query_parameters=[
+        bigquery.ArrayQueryParameter("changed_ids", "INT64", sorted(changed_ids))])
+    print(f"Number of changed people IDs in people table: {len(changed_people)}")
+    return pd.Series(changed_people['people_id'], dtype="int64").reset_index(drop=True)
     
-def get_tmdb_people_details(start_date: datetime, end_date: datetime):
+def get_tmdb_people_details(start_date: datetime, end_date: datetime, max_age: timedelta = DEFAULT_PEOPLE_MAX_AGE):
     """
     Retrieves people details for all new people IDs from TMDB API and upload to google cloud storage.
-    Also, retrieves updated people details for 
+    Also, retrieves updated people details for existing people that TMDB reports as changed in the time period.
 
     Args:
-        file_path (str): The file path where the NDJSON file will be saved.
+        start_date (datetime): Start date of time interval.
+        end_date (datetime): End date of time interval.
+        max_age (timedelta): New people fetched within this window are reused from the people detail store.
+            Default is 7 days.
 
     Returns:
         list: A list of people details
     """
-    new_people_ids, old_people_ids = new_updated_tmdb_people_id()
+    new_people_ids, existing_people_count = new_updated_tmdb_people_id()
     print("Number of new People IDs:", len(new_people_ids))
-    print("Number of old People IDs:", len(old_people_ids))
-    new_chunks_list = chunks(new_people_ids)
-    old_chunks_list = chunks(old_people_ids)
-    new_people_results = []
-    old_people_results = []
-
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        new_results = executor.map(people_info_chunks, new_chunks_list)
-        old_results = executor.map(people_update_chunks, old_chunks_list, [start_date]*len(old_chunks_list), [end_date]*len(old_chunks_list))
-
-    for result in new_results:
-        new_people_results = new_people_results + result
-    for result in old_results:
-        old_people_results = old_people_results + result
+    print("Number of old People IDs:", existing_people_count)
+    old_people_ids = changed_people_ids_to_update(start_date, end_date)
+    # Retries and overlapping runs reuse people fetched within `max_age`
+    store = PeopleDetailStore()
+    try:
+        new_people_results = list(fetch_people_details(new_people_ids, store=store, max_age=max_age))
+    finally:
+        store.close()
+    old_people_results = list(fetch_people_changes(old_people_ids, start_date, end_date))
         
     # initialize folder
     script_dir = os.path.dirname(os.path.realpath(__file__))
@@ -338,18 +306,20 @@ def get_tmdb_people_details(start_date: datetime, end_date: datetime):
         os.makedirs(folder_path)
 
     # write raw new + updated data to file        
-    new_people_filename = f"append_raw_people_{start_date.strftime('%Y%m%d')}.ndjson"
-    updated_people_filename = f"update_raw_people_{start_date.strftime('%Y%m%d')}.ndjson"
-
-    with open(os.path.join(folder_path, new_people_filename), "w") as ndjson_file:
-        ndjson_file.write('\n'.join(map(json.dumps, new_people_results)))
-    with open(os.path.join(folder_path, updated_people_filename), "w") as ndjson_file:
-        ndjson_file.write('\n'.join(map(json.dumps, old_people_results)))
+    new_people_filename = compressed_name(f"append_raw_people_{start_date.strftime('%Y%m%d')}.ndjson")
+    updated_people_filename = compressed_name(f"update_raw_people_{start_date.strftime('%Y%m%d')}.ndjson")
+
+    with open_raw_file(os.path.join(folder_path, new_people_filename)) as ndjson_file:
+        write_ndjson(ndjson_file, new_people_results)
+    with open_raw_file(os.path.join(folder_path, updated_people_filename)) as ndjson_file:
+        write_ndjson(ndjson_file, old_people_results)
+    # only the new people get a columnar copy, the changes records mix value types and are read as NDJSON
+    write_parquet_copy(os.path.join(folder_path, new_people_filename))
         
     try:
         bucket_name = "update_movies_tmdb"
         directory = Path(folder_path)
-        filenames = list([file.name for file in directory.glob(f'*.ndjson')])
+        filenames = list([file.name for file in [*directory.glob('*.ndjson'), *directory.glob('*.ndjson.gz'), *directory.glob('*.parquet')]])
         print(f"{filenames=}")
         # upload_many_blobs_with_transfer_manager(bucket_name, filenames=filenames, source_directory=str_directory)
         for filename in filenames:
@@ -371,83 +341,8 @@ def clean_new_raw_people_details(people_details, save_file_path:str, return_df=F
     Returns:
         filepath (str) or dataframe (pd.Dataframe)
     """
-    
-    people_results =  pd.DataFrame(people_details)
-    
-    people_info = pd.DataFrame()
-    
-    name_lst = []
-    bir_lst = []
-    gender_lst = []
-    pop = []
-    cast_credits = []
-    crew_credits = []
-    known = []
-    people_id = []
-    
-    for index, row in people_results.iterrows():
-        # Make the request
-        id_ = (int(row['id']))
-        people_id.append(id_)
-
-        try:
-            name = row['name']
-        except KeyError:
-            name = None
-        name_lst.append(name)
-        try:
-            birthday = row['birthday']
-        except KeyError:
-            birthday = None
-        bir_lst.append(birthday)
-        try:
-            gender = row['gender']
-        except KeyError:
-            gender = None
-        gender_lst.append(gender)
-        try:
-            tmdb_popularity = row['popularity']
-        except KeyError:
-            tmdb_popularity = None
-        pop.append(tmdb_popularity)
-        try:
-            known_for = row['known_for_department']
-        except KeyError:
-            known_for = None
-        known.append(known_for)
-        
-        # Number of credits
-        try:
-            cast_num = len(row['movie_credits']["cast"])
-        except KeyError:
-            cast_num = 0
-        cast_credits.append(cast_num)
-        try:
-            crew_num = len(row['movie_credits']["crew"])
-        except KeyError:
-            crew_num = 0
-        crew_credits.append(crew_num)
-
-    people_info['people_id'] = people_id
-    people_info['name'] = name_lst
-    people_info['birthday'] = bir_lst
-    people_info['gender'] = gender_lst
-    people_info['tmdb_popularity'] = pop
-    people_info['known_for'] = known
-    people_info['total_number_cast_credits'] = cast_credits
-    people_info['total_number_crew_credits'] = crew_credits
-    
-    # Convert birthday to Date
-    people_info['birthday'] = pd.to_datetime(people_info['birthday']).dt.date
-    
-    if not return_df:
-        folder_path = save_file_path
-        if not os.path.exists(folder_path):
-            os.makedirs(folder_path)
-        people_info.to_csv(os.path.join(folder_path, "cleaned_people_info.csv"), index=False)
-        return os.path.join(folder_path, "cleaned_people_info.csv")
-    else:
-        return people_info
+    people_info = transform_people_records(people_details)
+    return save_people_info(people_info, save_file_path, return_df=return_df)
 
 def clean_updated_people_details(people_details, save_file_path: str, return_df=False):
     """
@@ -0,0 +1,83 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from datetime import timedelta
+
+DEFAULT_PEOPLE_STORE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))),
+                                         "historical_data", "cache", "tmdb_people_details.sqlite")
+DEFAULT_PEOPLE_MAX_AGE = timedelta(days=7)
+
+
+class PeopleDetailStore:
+    """
+    Persistent on-disk store of the latest fetched people details, keyed by people id.
+
+    Each entry holds the full people record, as returned by the API, and the time it was fetched, so
+    retried and overlapping runs can reuse people fetched recently instead of calling the API again.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_PEOPLE_STORE_PATH):
+        """
+        Opens (and creates if needed) the store database.
+
+        Args:
+            db_path (str): Path of the SQLite file backing the store.
+        """
+        folder_path = os.path.dirname(db_path)
+        if folder_path and not os.path.exists(folder_path):
+            os.makedirs(folder_path)
+        self._lock = threading.Lock()
+        # Overlapping DAG runs may share the file, wait for each other's writes instead of failing
+        self._conn = sqlite3.connect(db_path, timeout=60, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("DROP TABLE IF EXISTS people") # slim records of earlier versions, not the shape of the raw files
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS people_details (
+                people_id INTEGER PRIMARY KEY,
+                record TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        ''')
+        self._conn.commit()
+
+    def get_fresh(self, people_ids, max_age: timedelta = DEFAULT_PEOPLE_MAX_AGE) -> dict:
+        """
+        Returns the stored records fetched within `max_age`.
+
+        Args:
+            people_ids (iterable): People IDs to look up.
+            max_age (timedelta): Freshness window. Default is 7 days.
+
+        Returns:
+            dict: The fresh records, keyed by people id.
+        """
+        people_ids = [int(people_id) for people_id in people_ids]
+        fetched_after = time.time() - max_age.total_seconds()
+        records = {}
+        with self._lock:
+            for start in range(0, len(people_ids), 500): # stay under SQLite's bound variable limit
+                batch = people_ids[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT people_id, record FROM people_details WHERE fetched_at >= ? AND people_id IN ({','.join('?' * len(batch))})",
+                    (fetched_after, *batch)).fetchall()
+                records.update({people_id: json.loads(record) for people_id, record in rows})
+        return records
+
+    def put(self, people_id: int, record: dict):
+        """
+        Stores the record of a person, stamped with the current time.
+
+        Args:
+            people_id (int): The people id.
+            record (dict): The people record, as returned by the API.
+        """
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO people_details (people_id, record, fetched_at) VALUES (?, ?, ?)",
+                               (int(people_id), json.dumps(record), time.time()))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+PEOPLE_COLUMNS = ['people_id', 'name', 'birthday', 'gender', 'tmdb_popularity', 'known_for',
+                  'total_number_cast_credits', 'total_number_crew_credits']
+
+
+def _credit_count(record: dict, credit_type: str) -> int:
+    """Returns the number of movie credits of one type ("cast" or "crew") in a record, 0 if missing."""
+    credits = record.get("movie_credits")
+    if not isinstance(credits, dict):
+        return 0
+    return len(credits.get(credit_type) or [])
+
+
+def transform_people_records(records: list) -> pd.DataFrame:
+    """
+    Cleans raw TMDB people details into the columns of the people table in one columnar pass.
+
+    Birthdays are parsed in bulk; malformed or out of range birthdays become missing values.
+
+    Args:
+        records (list of dicts): Raw TMDB people details, with `movie_credits` appended.
+
+    Returns:
+        pd.DataFrame: The cleaned people details, with columns in `PEOPLE_COLUMNS` order.
+    """
+    people_info = pd.DataFrame({
+        'people_id': np.array([record["id"] for record in records], dtype=np.int64),
+        'name': [record.get("name") for record in records],
+        'birthday': [record.get("birthday") for record in records],
+        'gender': [record.get("gender") for record in records],
+        'tmdb_popularity': [record.get("popularity") for record in records],
+        'known_for': [record.get("known_for_department") for record in records],
+        'total_number_cast_credits': np.array([_credit_count(record, "cast") for record in records], dtype=np.int64),
+        'total_number_crew_credits': np.array([_credit_count(record, "crew") for record in records], dtype=np.int64),
+    }, columns=PEOPLE_COLUMNS)
+
+    # Convert birthday to Date
+    people_info['birthday'] = pd.to_datetime(people_info['birthday'], format="%Y-%m-%d", errors="coerce").dt.date
+
+    return people_info
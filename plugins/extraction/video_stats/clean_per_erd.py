@@ -5,6 +5,8 @@ import logging
 from tqdm import tqdm
 from datetime import datetime
 from googlecloud.read_data_gcs import read_blob, list_blobs
+from googlecloud.columnar import columnar_blobs
+from extraction.video_stats.video_keys import read_video_keys_gcs
 from googleapiclient.discovery import build
 
 
@@ -17,23 +19,15 @@ def get_raw_video_details_gcs(start_date: datetime, end_date: datetime, bucket_n
         end_date (datetime, optional): Datetime object of end date to which to filter.
 
     Returns:
-        pd.DataFrame: Pandas DataFrame containing the video keys and additional video details.
+        pd.DataFrame: Pandas DataFrame containing the video keys and video details (movie_id, key, site, type, published_at).
     """
     prefix = "raw_movie_details"
     if "update" in bucket_name:
         prefix = "update_" + prefix
     if start_date and end_date:
         prefix = prefix + f"_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}"
-    filenames = list_blobs(bucket_name, prefix=prefix)
-    df = pd.DataFrame()
-    for filename in tqdm(filenames):
-        file_content = read_blob(bucket_name, filename)[["id", "videos"]].rename(columns={"id": "movie_id"})
-        file_content = file_content.dropna(subset=["videos"]).astype({"movie_id": int, "videos": object})
-        file_content["videos"] = file_content["videos"].apply(lambda x: x["results"])
-        file_content = file_content.explode("videos").dropna(subset=["videos"])
-        file_content = pd.concat([file_content["movie_id"].reset_index(drop=True), pd.json_normalize(file_content["videos"])], axis=1)
-        df = pd.concat([df, file_content], axis=0)
-    return df.drop_duplicates()
+    filenames = columnar_blobs(list_blobs(bucket_name, prefix=prefix))
+    return read_video_keys_gcs(bucket_name, filenames).drop_duplicates()
 
 def get_raw_video_statistics_gcs(start_date: datetime, end_date: datetime, bucket_name="movies_tmdb") -> pd.DataFrame:
     """
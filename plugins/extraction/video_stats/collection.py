@@ -1,5 +1,6 @@
 import os
-import time
+import threading
+import concurrent.futures
 import pandas as pd
 import numpy as np
 import requests
@@ -7,10 +8,25 @@ from pathlib import Path
 from tqdm import tqdm
 from datetime import datetime
 from dotenv import load_dotenv
-from googlecloud.read_data_gcs import read_blob, list_blobs
+from googlecloud.read_data_gcs import list_blobs
+from googlecloud.compression import compressed_name
+from googlecloud.columnar import columnar_blobs
 from googlecloud.upload_initial_data_gcs import upload_many_blobs_with_transfer_manager, upload_blob
 from googleapiclient.discovery import build
+from googleapiclient.http import build_http
 from airflow.exceptions import AirflowNotFoundException
+from extraction.video_stats.rate_limit import HeaderRateLimiter
+from extraction.video_stats.video_keys import read_video_keys_gcs
+from extraction.video_stats.store import VideoStatsStore, DEFAULT_VIDEO_STATS_MAX_AGE
+from datetime import timedelta
+
+DEFAULT_YOUTUBE_WORKERS = 8
+DEFAULT_VIMEO_WORKERS = 4
+VIMEO_MAX_RETRIES = 5
+
+_youtube_client = None
+_youtube_client_lock = threading.Lock()
+_thread_local = threading.local()
 
 
 def get_video_keys_gcs(start_date: datetime, end_date: datetime) -> pd.DataFrame:
@@ -18,23 +34,14 @@ def get_video_keys_gcs(start_date: datetime, end_date: datetime) -> pd.DataFrame
     Retrieves the video collection IDs and details from files stored in Google Cloud Storage (GCS), based on start and end dates.
 
     Returns:
-        pd.DataFrame: Pandas DataFrame containing the video keys (and details) needed to call YouTube/Vimeo APIs.
+        pd.DataFrame: Pandas DataFrame containing the video keys (movie_id, key, site, type, published_at) needed to call YouTube/Vimeo APIs.
     """
     bucket_name = "update_movies_tmdb"
     print(f"update_raw_movie_details_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}")
-    filenames = list_blobs("update_movies_tmdb", prefix=f"update_raw_movie_details_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}")
+    filenames = columnar_blobs(list_blobs("update_movies_tmdb", prefix=f"update_raw_movie_details_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}"))
     if not filenames:
         raise AirflowNotFoundException("Update movie details raw JSON files not found!")
-    
-    df = pd.DataFrame()
-    for filename in tqdm(filenames):
-        file_content = read_blob(bucket_name, filename)[["id", "videos"]].rename(columns={"id": "movie_id"})
-        file_content = file_content.dropna(subset=["videos"]).astype({"movie_id": int, "videos": object})
-        file_content["videos"] = file_content["videos"].apply(lambda x: x["results"])
-        file_content = file_content.explode("videos").dropna(subset=["videos"])
-        file_content = pd.concat([file_content["movie_id"].reset_index(drop=True), pd.json_normalize(file_content["videos"])], axis=1)
-        df = pd.concat([df, file_content], axis=0)
-    return df
+    return read_video_keys_gcs(bucket_name, filenames)
 
 def chunks(series: pd.Series, length_pieces: int = 50):
     """
@@ -56,37 +63,112 @@ def chunks(series: pd.Series, length_pieces: int = 50):
     indices = np.array(indices)[:len(series)]
     return [series.loc[indices == i] for i in np.unique(indices)]
 
+def get_youtube_client():
+    """
+    Returns the process-wide YouTube API client, building it on first use from the discovery document
+    bundled with google-api-python-client (no discovery request is made).
+
+    Returns:
+        googleapiclient.discovery.Resource: The YouTube Data API v3 client.
+    """
+    global _youtube_client
+    with _youtube_client_lock:
+        if _youtube_client is None:
+            load_dotenv()
+            YOUTUBE_API_TOKEN = os.getenv("YOUTUBE_API_TOKEN")
+            api_service_name = "youtube"
+            api_version = "v3"
+            _youtube_client = build(api_service_name, api_version, developerKey=YOUTUBE_API_TOKEN,
+                                    static_discovery=True, cache_discovery=False)
+        return _youtube_client
+
+def _thread_http():
+    """Returns the HTTP connection of the current thread, the client's own connection is not thread-safe."""
+    if not hasattr(_thread_local, "http"):
+        _thread_local.http = build_http()
+    return _thread_local.http
+
 def get_youtube_video_stats(chunk: list) -> list:
     """
     Retrieves video statistics from YouTube for one chunk of keys at a time.
 
     Args:
-        chunks (list): A list of series of video keys.
+        chunks (list): A list of up to 50 video keys.
 
     Returns:
         response (list): List containing YouTube video statistics data as records.
     """
-    load_dotenv()
-    YOUTUBE_API_TOKEN = os.getenv("YOUTUBE_API_TOKEN")
-    api_service_name = "youtube"
-    api_version = "v3"
-    youtube = build(api_service_name, api_version, developerKey=YOUTUBE_API_TOKEN)
-    request = youtube.videos().list(
+    request = get_youtube_client().videos().list(
         part="statistics",
         id=chunk
     )
-    response = request.execute()
-    print(response)
+    response = request.execute(http=_thread_http(), num_retries=3)
 
     results = [item for item in response["items"]]
     return results
 
-def get_vimeo_video_stats(keys: list) -> list:
+def fetch_youtube_video_stats(video_keys: pd.Series, max_workers: int = DEFAULT_YOUTUBE_WORKERS) -> list:
+    """
+    Retrieves video statistics from YouTube for all keys, requesting chunks of 50 keys concurrently.
+
+    Args:
+        video_keys (pd.Series): YouTube video keys.
+        max_workers (int): Number of concurrent requests. Default is 8.
+
+    Returns:
+        list: List containing YouTube video statistics data as records.
+    """
+    youtube_chunks_list = [chunk.tolist() for chunk in chunks(video_keys)]
+    results = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for chunk_results in tqdm(executor.map(get_youtube_video_stats, youtube_chunks_list), total=len(youtube_chunks_list)):
+            results.extend(chunk_results)
+    return results
+
+def get_vimeo_video_record(video_key: str, session: requests.Session, rate_limiter: HeaderRateLimiter) -> dict:
+    """
+    Retrieves video statistics from Vimeo for one key, paced by the rate limiter and retrying rate limited (429) requests.
+
+    Args:
+        video_key (str): The Vimeo video key.
+        session (requests.Session): Session holding the Vimeo authorization headers.
+        rate_limiter (HeaderRateLimiter): Rate limiter shared by all workers.
+
+    Returns:
+        dict: Vimeo video statistics data as a record, with only the key if the request failed.
     """
-    Retrieves video statistics from Vimeo for one chunk of keys at a time.
+    api_url = f'https://api.vimeo.com/videos/{video_key}?fields=stats,metadata'
+    record = {"video_key_id": video_key}
+    for _ in range(VIMEO_MAX_RETRIES + 1):
+        rate_limiter.acquire()
+        try:
+            response = session.get(api_url)
+        except requests.RequestException as e:
+            rate_limiter.release()
+            print(f"Failed to retrieve video data. Error details: {e}")
+            return record
+        rate_limiter.release(response.headers, rate_limited=response.status_code == 429)
+        if response.status_code != 429:
+            break
+
+    # Check if request was successful (status code 200)
+    if response.status_code == 200:
+        video_data = response.json()
+        record["view_count"] = video_data["stats"]["plays"]
+        record["like_count"] = video_data["metadata"]["connections"]["likes"]["total"]
+        record["comment_count"] = video_data["metadata"]["connections"]["comments"]["total"]
+    else:
+        print(f"Failed to retrieve video data. Status code: {response.status_code}")
+    return record
+
+def get_vimeo_video_stats(keys: list, max_workers: int = DEFAULT_VIMEO_WORKERS) -> list:
+    """
+    Retrieves video statistics from Vimeo with a small pool of concurrent requests, paced to the quota reported
+    in Vimeo's rate limit headers.
 
     Args:
         keys (list): A list of video keys.
+        max_workers (int): Number of concurrent requests. Default is 4.
 
     Returns:
         results (list): List containing Vimeo video statistics data as records.
@@ -94,46 +176,33 @@ def get_vimeo_video_stats(keys: list) -> list:
     load_dotenv()
     VIMEO_API_TOKEN = os.getenv("VIMEO_API_TOKEN")
 
-    results = []
-    RATE_LIMIT = 50 # Vimeo API rate limit, as of Apr 2024
-    rate_limit_count = 0
-
-    for video_key in tqdm(keys):
-        api_url = f'https://api.vimeo.com/videos/{video_key}?fields=stats,metadata'
-        headers = {
-            'Authorization': f'Bearer {VIMEO_API_TOKEN}',
-            'Content-Type': 'application/json'
-        }
-        response = requests.get(api_url, headers=headers)
-        record = {"video_key_id": video_key}
-
-        # Check if request was successful (status code 200)
-        if response.status_code == 200:
-            video_data = response.json()
-            record["view_count"] = video_data["stats"]["plays"]
-            record["like_count"] = video_data["metadata"]["connections"]["likes"]["total"]
-            record["comment_count"] = video_data["metadata"]["connections"]["comments"]["total"]
-        else:
-            print(f"Failed to retrieve video data. Status code: {response.status_code}")
-
-        results.append(record)
-        rate_limit_count += 1
-
-        if rate_limit_count >= RATE_LIMIT: # every X counts scraped, sleep for 45 seconds
-            time.sleep(45)
-            rate_limit_count = 0
+    session = requests.Session()
+    session.headers.update({
+        'Authorization': f'Bearer {VIMEO_API_TOKEN}',
+        'Content-Type': 'application/json'
+    })
+    rate_limiter = HeaderRateLimiter()
+
+    keys = list(keys)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(tqdm(executor.map(lambda video_key: get_vimeo_video_record(video_key, session, rate_limiter), keys), total=len(keys)))
+    session.close()
 
     return results
 
-def extract_raw_video_stats(raw_file_dir: str, start_date: datetime, end_date: datetime):
+def extract_raw_video_stats(raw_file_dir: str, start_date: datetime, end_date: datetime, max_age: timedelta = DEFAULT_VIDEO_STATS_MAX_AGE):
     """
     Cleans the raw movie details from ndjson files and saves the cleaned results after extracting video details into a CSV file.
     Upload the CSV file into Google Cloud Storage.
+
+    Statistics of keys fetched within `max_age` (e.g. by an overlapping run) are taken from the video stats
+    freshness index instead of the YouTube/Vimeo APIs.
     
     Args:
         raw_file_dir (str): The absolute directory path where the raw collection details CSV file will be saved.
         start_date (datetime): Datetime object of start date from which to filter.
         end_date (datetime): Datetime object of end date to which to filter.
+        max_age (timedelta): Freshness window of stored video statistics. Default is 3 days.
 
     Returns:
         None
@@ -142,30 +211,40 @@ def extract_raw_video_stats(raw_file_dir: str, start_date: datetime, end_date: d
     video_key_df = get_video_keys_gcs(start_date, end_date)
     
     # filter for different video sites
-    vimeo_video_keys = video_key_df[video_key_df["site"] == "Vimeo"]["key"]
-    youtube_video_keys = video_key_df[video_key_df["site"] == "YouTube"]["key"]
+    vimeo_video_keys = video_key_df[video_key_df["site"] == "Vimeo"]["key"].drop_duplicates()
+    youtube_video_keys = video_key_df[video_key_df["site"] == "YouTube"]["key"].drop_duplicates()
     
     # create raw file storage directory if not exists
     if not os.path.exists(raw_file_dir):
         os.makedirs(raw_file_dir)
 
-    # fetch vimeo data
-    vimeo_results = get_vimeo_video_stats(vimeo_video_keys)
-    if vimeo_results:
-        vimeo_df = pd.DataFrame(vimeo_results)
-        vimeo_df.to_csv(os.path.join(raw_file_dir, f"raw_vimeo_video_stats_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.csv"), index=False)
-
-    # fetch youtube data
-    youtube_chunks_list = chunks(youtube_video_keys)
-    youtube_results = []
-    for chunk in youtube_chunks_list:
-        youtube_results.extend(get_youtube_video_stats(chunk.tolist()))
+    store = VideoStatsStore()
+    try:
+        # fetch vimeo data, only for keys not refreshed within max_age
+        stored_vimeo = store.get_fresh("Vimeo", vimeo_video_keys, max_age=max_age)
+        print(f"Vimeo keys: {len(vimeo_video_keys)}, reused from freshness index: {len(stored_vimeo)}")
+        fetched_vimeo = get_vimeo_video_stats(vimeo_video_keys[~vimeo_video_keys.isin(stored_vimeo)])
+        store.put_many("Vimeo", {record["video_key_id"]: record for record in fetched_vimeo if "view_count" in record})
+        vimeo_results = list(stored_vimeo.values()) + fetched_vimeo
+        if vimeo_results:
+            vimeo_df = pd.DataFrame(vimeo_results)
+            vimeo_df.to_csv(os.path.join(raw_file_dir, compressed_name(f"raw_vimeo_video_stats_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.csv")), index=False)
+
+        # fetch youtube data, only for keys not refreshed within max_age
+        stored_youtube = store.get_fresh("YouTube", youtube_video_keys, max_age=max_age)
+        print(f"YouTube keys: {len(youtube_video_keys)}, reused from freshness index: {len(stored_youtube)}")
+        fetched_youtube = fetch_youtube_video_stats(youtube_video_keys[~youtube_video_keys.isin(stored_youtube)])
+        store.put_many("YouTube", {result["id"]: result for result in fetched_youtube})
+        youtube_results = list(stored_youtube.values()) + fetched_youtube
+    finally:
+        store.close()
+
     if youtube_results:
         youtube_statistics = [{"id": result["id"], **result["statistics"]} for result in youtube_results]
         youtube_df = pd.DataFrame(youtube_statistics)
-        youtube_df.to_csv(os.path.join(raw_file_dir, f"raw_youtube_video_stats_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.csv"), index=False)
+        youtube_df.to_csv(os.path.join(raw_file_dir, compressed_name(f"raw_youtube_video_stats_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.csv")), index=False)
 
     # upload to gcs
-    filenames = list([file.name for file in Path(raw_file_dir).glob(f"raw_*_video_stats_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.csv")])
+    filenames = list([file.name for file in Path(raw_file_dir).glob(f"raw_*_video_stats_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.csv*")])
     for filename in filenames:
         upload_blob("update_movies_tmdb", os.path.join(Path(raw_file_dir), filename), filename)
\ No newline at end of file
@@ -0,0 +1,83 @@
+import time
+import threading
+from datetime import datetime
+
+DEFAULT_RESET_SECONDS = 60 # wait used when a rate limited response carries no reset time
+
+
+def _parse_reset(headers) -> float:
+    """
+    Returns the time (epoch seconds) at which the rate limit window resets, from the X-RateLimit-Reset header
+    (an ISO 8601 datetime for Vimeo, epoch seconds for some other APIs) or the Retry-After header.
+
+    Args:
+        headers (dict): Response headers.
+
+    Returns:
+        float or None: Epoch seconds of the reset, or None if the headers carry no reset time.
+    """
+    reset = headers.get("X-RateLimit-Reset")
+    if reset:
+        try:
+            return float(reset)
+        except ValueError:
+            pass
+        try:
+            return datetime.fromisoformat(reset.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            pass
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return time.time() + float(retry_after)
+        except ValueError:
+            pass
+    return None
+
+
+class HeaderRateLimiter:
+    """
+    Paces concurrent requests to the quota reported by the API's X-RateLimit-Remaining / X-RateLimit-Reset headers.
+
+    Requests go through freely while the remaining quota covers the requests in flight. Once it is used up,
+    workers wait until the reported reset time, then probe the API again.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._remaining = None # unknown until the first response
+        self._reset_at = 0.0
+        self._in_flight = 0
+
+    def acquire(self):
+        """Blocks until a request can be sent within the remaining quota."""
+        with self._condition:
+            while True:
+                now = time.time()
+                if self._remaining is not None and now >= self._reset_at:
+                    self._remaining = None # window has reset, the next response reports the new quota
+                if self._remaining is None or self._remaining - self._in_flight > 0:
+                    self._in_flight += 1
+                    return
+                self._condition.wait(timeout=max(self._reset_at - now, 0.1))
+
+    def release(self, headers=None, rate_limited: bool = False):
+        """
+        Records the quota reported by a response and wakes up waiting workers.
+
+        Args:
+            headers (dict, optional): Response headers, None if the request failed without a response.
+            rate_limited (bool): True if the response was a 429, the quota is then treated as used up.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if headers is not None:
+                remaining = headers.get("X-RateLimit-Remaining")
+                reset_at = _parse_reset(headers)
+                if rate_limited:
+                    self._remaining = 0
+                    self._reset_at = reset_at or time.time() + DEFAULT_RESET_SECONDS
+                elif remaining is not None:
+                    self._remaining = int(remaining)
+                    self._reset_at = reset_at or self._reset_at
+            self._condition.notify_all()
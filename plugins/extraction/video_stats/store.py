@@ -0,0 +1,85 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from datetime import timedelta
+
+DEFAULT_VIDEO_STATS_STORE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))),
+                                              "historical_data", "cache", "video_stats_freshness.sqlite")
+DEFAULT_VIDEO_STATS_MAX_AGE = timedelta(days=3) # shorter than the weekly schedule, so every run refreshes last week's keys
+
+
+class VideoStatsStore:
+    """
+    Persistent on-disk freshness index of video statistics, keyed by site and video key.
+
+    Each entry holds the last fetched statistics record of a video (in the format returned by the site's API
+    helper) and the time it was fetched, so overlapping runs only call the APIs for keys older than `max_age`.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_VIDEO_STATS_STORE_PATH):
+        """
+        Opens (and creates if needed) the index database.
+
+        Args:
+            db_path (str): Path of the SQLite file backing the index.
+        """
+        folder_path = os.path.dirname(db_path)
+        if folder_path and not os.path.exists(folder_path):
+            os.makedirs(folder_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=60, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS video_stats (
+                site TEXT NOT NULL,
+                video_key TEXT NOT NULL,
+                record TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (site, video_key)
+            )
+        ''')
+        self._conn.commit()
+
+    def get_fresh(self, site: str, video_keys, max_age: timedelta = DEFAULT_VIDEO_STATS_MAX_AGE) -> dict:
+        """
+        Returns the stored statistics records fetched within `max_age`.
+
+        Args:
+            site (str): "YouTube" or "Vimeo".
+            video_keys (iterable): Video keys to look up.
+            max_age (timedelta): Freshness window. Default is 3 days.
+
+        Returns:
+            dict: The fresh records, keyed by video key.
+        """
+        video_keys = [str(video_key) for video_key in video_keys]
+        fetched_after = time.time() - max_age.total_seconds()
+        records = {}
+        with self._lock:
+            for start in range(0, len(video_keys), 500): # stay under SQLite's bound variable limit
+                batch = video_keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT video_key, record FROM video_stats WHERE site = ? AND fetched_at >= ? AND video_key IN ({','.join('?' * len(batch))})",
+                    (site, fetched_after, *batch)).fetchall()
+                records.update({video_key: json.loads(record) for video_key, record in rows})
+        return records
+
+    def put_many(self, site: str, records: dict):
+        """
+        Stores the statistics records of videos, stamped with the current time.
+
+        Args:
+            site (str): "YouTube" or "Vimeo".
+            records (dict): Statistics records, keyed by video key.
+        """
+        fetched_at = time.time()
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO video_stats (site, video_key, record, fetched_at) VALUES (?, ?, ?, ?)",
+                                   [(site, str(video_key), json.dumps(record), fetched_at) for video_key, record in records.items()])
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
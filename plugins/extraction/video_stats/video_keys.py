@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+from googlecloud.read_data_gcs import read_blob
+from googlecloud.columnar import PARQUET_SUFFIX
+
+VIDEO_KEY_COLUMNS = ["movie_id", "key", "site", "type", "published_at"]
+
+
+def iter_video_rows(movies):
+    """
+    Walks the videos of raw movie details, yielding one flat row per video.
+
+    Args:
+        movies (iterable): Iterable of (movie id, `videos` field of the raw movie details) pairs.
+
+    Yields:
+        tuple: (movie_id, key, site, type, published_at) of each video.
+    """
+    for movie_id, videos in movies:
+        results = videos.get("results") if isinstance(videos, dict) else None
+        if results is None:
+            continue
+        for video in results:
+            if video is None:
+                continue
+            yield movie_id, video.get("key"), video.get("site"), video.get("type"), video.get("published_at")
+
+
+def _iter_blob_movies(bucket_name: str, filename: str):
+    """Yields (movie id, videos) pairs from a raw movie details blob, reading only those columns from Parquet copies."""
+    if filename.endswith(PARQUET_SUFFIX):
+        file_content = read_blob(bucket_name, filename, columns=["id", "videos"])
+        return zip(file_content["id"].tolist(), file_content["videos"].tolist())
+    return ((record.get("id"), record.get("videos")) for record in read_blob(bucket_name, filename, json_as_dict=True))
+
+
+def read_video_keys_gcs(bucket_name: str, filenames: list) -> pd.DataFrame:
+    """
+    Extracts the video keys of raw movie details stored in Google Cloud Storage (GCS).
+
+    Videos are streamed from each file into column buffers and the DataFrame is built once at the end.
+
+    Args:
+        bucket_name (str): Name of the bucket holding the raw movie details.
+        filenames (list): Blob names of the raw movie details (NDJSON or their Parquet copies).
+
+    Returns:
+        pd.DataFrame: One row per video, with columns in `VIDEO_KEY_COLUMNS` order.
+    """
+    movie_ids, keys, sites, types, published_ats = [], [], [], [], []
+    for filename in tqdm(filenames):
+        for movie_id, key, site, video_type, published_at in iter_video_rows(_iter_blob_movies(bucket_name, filename)):
+            movie_ids.append(movie_id)
+            keys.append(key)
+            sites.append(site)
+            types.append(video_type)
+            published_ats.append(published_at)
+    return pd.DataFrame({
+        "movie_id": np.array(movie_ids, dtype=np.int64),
+        "key": keys,
+        "site": sites,
+        "type": types,
+        "published_at": published_ats,
+    }, columns=VIDEO_KEY_COLUMNS)
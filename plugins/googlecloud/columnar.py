@@ -0,0 +1,72 @@
+import os
+import json
+import pyarrow as pa
+import pyarrow.parquet as pq
+from googlecloud.compression import COMPRESSED_SUFFIX, open_raw_file
+
+PARQUET_SUFFIX = ".parquet" # columnar copy of a raw NDJSON drop
+RAW_SUFFIXES = (".ndjson", ".json")
+
+
+def parquet_name(filename: str) -> str:
+    """Returns the name of the Parquet copy of a raw file, e.g. "raw_people_20240422.ndjson.gz" -> "raw_people_20240422.parquet"."""
+    if filename.endswith(COMPRESSED_SUFFIX):
+        filename = filename[:-len(COMPRESSED_SUFFIX)]
+    for suffix in RAW_SUFFIXES:
+        if filename.endswith(suffix):
+            return filename[:-len(suffix)] + PARQUET_SUFFIX
+    return filename + PARQUET_SUFFIX
+
+
+def write_parquet_copy(ndjson_path: str):
+    """
+    Writes a Parquet copy of a (possibly gzip compressed) raw NDJSON file next to it.
+
+    Nested fields are kept as Parquet struct/list columns, so readers can load only the top-level
+    columns they need. The copy is best effort: the raw NDJSON file stays the source of truth, so a
+    failure (e.g. fields whose types vary between records) is printed and no copy is written.
+
+    Args:
+        ndjson_path (str): Path of the NDJSON file.
+
+    Returns:
+        str or None: Path of the Parquet file, or None if the NDJSON file holds no records or the copy failed.
+    """
+    with open_raw_file(ndjson_path, mode="r") as ndjson_file:
+        records = [json.loads(line) for line in ndjson_file if line.strip()]
+    if not records:
+        return None
+    parquet_path = os.path.join(os.path.dirname(ndjson_path), parquet_name(os.path.basename(ndjson_path)))
+    try:
+        # written under a temporary name, so an interrupted write never leaves a truncated copy in place
+        pq.write_table(pa.Table.from_pylist(records), parquet_path + ".tmp")
+        os.replace(parquet_path + ".tmp", parquet_path)
+    except (pa.ArrowException, OSError) as e:
+        print(f"Error in writing Parquet copy of {ndjson_path}, readers will use the raw file \n Error details: {e}")
+        # never leave a partial or stale copy that readers would prefer over the raw file
+        for path in (parquet_path + ".tmp", parquet_path):
+            if os.path.exists(path):
+                os.remove(path)
+        return None
+    return parquet_path
+
+
+def raw_blobs(filenames: list) -> list:
+    """Drops the Parquet copies from a list of blob names, keeping the raw NDJSON/JSON drops."""
+    return [filename for filename in filenames if not filename.endswith(PARQUET_SUFFIX)]
+
+
+def columnar_blobs(filenames: list) -> list:
+    """
+    Picks one blob per raw drop, preferring its Parquet copy when one exists.
+
+    Drops uploaded before Parquet copies were written are returned as their NDJSON blob.
+
+    Args:
+        filenames (list): Blob names, e.g. from `list_blobs`.
+
+    Returns:
+        list: Blob names to read.
+    """
+    parquet_filenames = {filename for filename in filenames if filename.endswith(PARQUET_SUFFIX)}
+    return sorted(parquet_filenames) + [filename for filename in raw_blobs(filenames) if parquet_name(filename) not in parquet_filenames]
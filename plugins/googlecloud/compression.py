@@ -0,0 +1,44 @@
+import gzip
+
+COMPRESSED_SUFFIX = ".gz" # raw files are written gzip compressed
+
+
+def compressed_name(filename: str) -> str:
+    """Returns the name of the compressed version of a raw file, e.g. "raw_people.ndjson" -> "raw_people.ndjson.gz"."""
+    return filename if filename.endswith(COMPRESSED_SUFFIX) else filename + COMPRESSED_SUFFIX
+
+
+def open_raw_file(path: str, mode: str = "w", compress: bool = None):
+    """
+    Opens a raw data file in text mode, gzip compressed if the path ends with ".gz".
+
+    Args:
+        path (str): Path of the file.
+        mode (str): "w", "a" or "r". Default is "w".
+        compress (bool, optional): Force (or disable) gzip compression regardless of the extension,
+            e.g. for temporary files.
+
+    Returns:
+        file object: The opened file.
+    """
+    if compress is None:
+        compress = path.endswith(COMPRESSED_SUFFIX)
+    if compress:
+        return gzip.open(path, mode + "t")
+    return open(path, mode)
+
+
+def decompress_content(blob_name: str, content: bytes):
+    """
+    Decompresses the content of a blob based on its extension.
+
+    Args:
+        blob_name (str): Name of the blob, e.g. "raw_people_20240422.ndjson.gz".
+        content (bytes): The downloaded content.
+
+    Returns:
+        tuple(str, bytes): The blob name without the compression extension, and the decompressed content.
+    """
+    if blob_name.endswith(COMPRESSED_SUFFIX):
+        return blob_name[:-len(COMPRESSED_SUFFIX)], gzip.decompress(content)
+    return blob_name, content
@@ -4,13 +4,14 @@ import pandas as pd
 from datetime import datetime
 import logging
 
-def load_data_from_table(query, project_id="is3107-418809") -> pd.DataFrame:
+def load_data_from_table(query, project_id="is3107-418809", query_parameters=None) -> pd.DataFrame:
     """
     Loads data from a BigQuery table using provided query.
 
     Args:
         query (str): The SQL query to execute for BigQuery.
         project_id (str: The ID of the Google Cloud project.
+        query_parameters (list, optional): BigQuery query parameters referenced in the query, e.g. `@ids`.
 
     Returns:
         pandas.DataFrame: The loaded data as a pandas DataFrame.
@@ -22,7 +23,8 @@ def load_data_from_table(query, project_id="is3107-418809") -> pd.DataFrame:
     client = bigquery.Client(project=project_id)
 
     try:
-        df = client.query(query).to_dataframe()
+        job_config = bigquery.QueryJobConfig(query_parameters=query_parameters or [])
+        df = client.query(query, job_config=job_config).to_dataframe()
         logging.info('Retrieved successfully query: {query}')
     except Exception as e:
         raise Exception(f"Error in loading data: {e}")
@@ -4,6 +4,8 @@ from pathlib import Path
 import pandas as pd
 import json
 import os
+from googlecloud.compression import decompress_content
+from googlecloud.columnar import PARQUET_SUFFIX
 
 def list_blobs_object(bucket_name, prefix=None):
     """Lists files in a Google Cloud Storage bucket"""
@@ -33,7 +35,7 @@ def list_blobs(bucket_name, prefix=None):
     return [blob.name for blob in blobs]
 
 
-def read_blob(bucket_name, blob_name, json_as_dict=False):
+def read_blob(bucket_name, blob_name, json_as_dict=False, columns=None):
     script_dir = os.path.dirname(os.path.realpath(__file__))
     json_path = os.path.join(script_dir, "is3107-418809-92db84ea97f6.json")
     os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = json_path
@@ -48,17 +50,28 @@ def read_blob(bucket_name, blob_name, json_as_dict=False):
     # Get the blob
     blob = bucket.blob(blob_name)
 
-    # Download the blob's content as a string
-    content = BytesIO(blob.download_as_string())
+    # Parquet blobs are read through a seekable reader, so only the footer and the requested columns are downloaded
+    if blob_name.endswith(PARQUET_SUFFIX):
+        with blob.open("rb") as parquet_file:
+            return pd.read_parquet(parquet_file, columns=columns)
+
+    # Download the blob's content as a string, decompressing .gz blobs
+    blob_name, data = decompress_content(blob_name, blob.download_as_bytes())
+    content = BytesIO(data)
 
     if blob_name.endswith(".csv"):
         df = pd.read_csv(content)
-    elif blob_name.endswith(".ndjson"):
+    elif blob_name.endswith(".ndjson") and not json_as_dict:
         df = pd.read_json(content, lines=True)
+    elif blob_name.endswith(".ndjson") and json_as_dict:
+        df = [json.loads(line) for line in content if line.strip()] # list of records
     elif blob_name.endswith(".json") and not json_as_dict:
         df = pd.read_json(content)
     elif blob_name.endswith(".json") and json_as_dict:
         content.seek(0) # Reset the file pointer to the start
         df = json.load(content)
 
+    if columns is not None and isinstance(df, pd.DataFrame):
+        df = df[columns]
+
     return df
\ No newline at end of file
@@ -4,6 +4,7 @@ import os
 from google.cloud import storage
 from pathlib import Path
 from google.cloud.storage import Client, transfer_manager
+from googlecloud.compression import COMPRESSED_SUFFIX
 
 
 def upload_blob(bucket_name, source_file_name, destination_blob_name):
@@ -21,8 +22,11 @@ def upload_blob(bucket_name, source_file_name, destination_blob_name):
     # Define the blob object
     blob = bucket.blob(destination_blob_name)
 
-    # Upload the file
-    blob.upload_from_filename(source_file_name)
+    # Upload the file, compressed files are stored as-is (no decompressive transcoding) and read_blob decompresses them
+    if destination_blob_name.endswith(COMPRESSED_SUFFIX):
+        blob.upload_from_filename(source_file_name, content_type="application/gzip")
+    else:
+        blob.upload_from_filename(source_file_name)
 
     print(f"File {source_file_name} uploaded to {destination_blob_name}.")
 
@@ -41,8 +45,11 @@ def upload_many_blobs_with_transfer_manager(bucket_name, filenames, source_direc
     storage_client = Client()
     bucket = storage_client.bucket(bucket_name)
 
+    upload_kwargs = None
+    if filenames and all(filename.endswith(COMPRESSED_SUFFIX) for filename in filenames):
+        upload_kwargs = {"content_type": "application/gzip"}
     results = transfer_manager.upload_many_from_filenames(
-        bucket, filenames, source_directory=source_directory, max_workers=workers
+        bucket, filenames, source_directory=source_directory, max_workers=workers, upload_kwargs=upload_kwargs
     )
 
     for name, result in zip(filenames, results):